@@ -5,35 +5,35 @@ Path Helper Module
 Tüm dosyalar için absolute path yönetimi
 """
 
-import os
+from pathlib import Path
 
-# Project root directory
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Project root directory (import sırasında bir kez çözülür)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 def get_project_path(*paths):
     """Project root'tan relative path ile absolute path döndür"""
-    return os.path.join(PROJECT_ROOT, *paths)
+    return PROJECT_ROOT.joinpath(*paths)
+
+# Proxy dizini
+PROXIES_DIR = PROJECT_ROOT / "proxies"
 
 # Yaygın kullanılan dosya path'leri
-PROXY_LIST_FILE = get_project_path("proxy_list.txt")
-PROXY_POOL_FILE = get_project_path("proxies", "proxy_pool.txt")
-BLACKLIST_FILE = get_project_path("proxies", "blacklist.txt")
-WORKING_PROXIES_FILE = get_project_path("proxies", "working_proxies.txt")
-VALID_PROXY_POOL_FILE = get_project_path("proxies", "proxy_pool.json")
+PROXY_LIST_FILE = PROJECT_ROOT / "proxy_list.txt"
+PROXY_POOL_FILE = PROXIES_DIR / "proxy_pool.txt"
+BLACKLIST_FILE = PROXIES_DIR / "blacklist.txt"
+WORKING_PROXIES_FILE = PROXIES_DIR / "working_proxies.txt"
+VALID_PROXY_POOL_FILE = PROXIES_DIR / "proxy_pool.json"
 
 # Config dosyaları
-TELEGRAM_CONFIG_FILE = get_project_path("config", "telegram_config.json")
+TELEGRAM_CONFIG_FILE = PROJECT_ROOT / "config" / "telegram_config.json"
 
 # Log dosyası
-RANDEVU_BOT_LOG = get_project_path("randevu_bot.log")
-
-# Proxy dizini
-PROXIES_DIR = get_project_path("proxies")
+RANDEVU_BOT_LOG = PROJECT_ROOT / "randevu_bot.log"
 
 def ensure_directories():
     """Gerekli dizinleri oluştur"""
-    os.makedirs(PROXIES_DIR, exist_ok=True)
-    os.makedirs(os.path.dirname(TELEGRAM_CONFIG_FILE), exist_ok=True)
+    PROXIES_DIR.mkdir(parents=True, exist_ok=True)
+    TELEGRAM_CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 if __name__ == "__main__":
     print(f"Project Root: {PROJECT_ROOT}")
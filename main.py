@@ -9,8 +9,12 @@ ProxyManager kullanarak proxy testini optimizasyonu.
 import logging
 import time
 import os
+import re
 import signal
 import sys
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from sites.usvisa import USVisaChecker
 from sites.idata import IdataChecker
@@ -33,20 +37,51 @@ logging.basicConfig(
 
 # Console output için UTF-8 encoding ayarla (Windows için)
 if sys.platform.startswith('win'):
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.reconfigure(encoding='utf-8', errors='strict')
+        except AttributeError:
+            pass
 
 logger = logging.getLogger(__name__)
 
+# Opsiyonel modüller (bir kez import edilir, logging ayarlandıktan sonra)
+try:
+    from telegram import send_telegram as _send_telegram
+except ImportError:
+    _send_telegram = None
+
+_proxy_updater_import_error = None
+try:
+    from update_proxies import ProxyUpdater
+except ImportError as e:
+    ProxyUpdater = None
+    _proxy_updater_import_error = e
+
 # Global ProxyManager instance
 proxy_manager = None
 
+# Proxy dosyası satırları: '#' ile başlamayan, boş olmayan satırın strip edilmiş hali
+_PROXY_LINE_RE = re.compile(r'^(?!#)[ \t]*(\S(?:.*\S)?)[ \t]*$', re.M)
+
+# Shutdown sinyali için event (bekleme süresini kesmek için)
+_shutdown = threading.Event()
+
+# Paralel checker'lardan gelen bildirimleri sırala
+_telegram_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _format_time(fmt, epoch_s):
+    """Saniye çözünürlüğünde formatlanmış zaman (aynı saniye için cache'lenir)"""
+    return time.strftime(fmt, time.localtime(epoch_s))
+
 
 def signal_handler(signum, frame):
     """Graceful shutdown için signal handler"""
     global proxy_manager
     logger.info("Shutdown sinyali alındı...")
+    _shutdown.set()
     
     if proxy_manager:
         logger.info("Background proxy updater durduruluyor...")
@@ -56,101 +91,148 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 
+def read_proxy_lines(path):
+    """Proxy dosyasındaki boş olmayan, yorum olmayan satırları (strip edilmiş) döndür"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return _PROXY_LINE_RE.findall(f.read())
+
+
 def setup_legacy_proxy_files():
     """Eski proxy sisteminden yeni sisteme geçiş"""
     try:
-        # Eski proxy_list.txt varsa proxies/ klasörüne taşı
-        if os.path.exists(PROXY_LIST_FILE) and not os.path.exists(PROXY_POOL_FILE):
+        # Proxy pool sadece yoksa oluşturulur (exclusive create); varsa hiçbir dosya okunmaz
+        try:
+            fout = open(PROXY_POOL_FILE, 'x', encoding='utf-8')
+        except FileExistsError:
+            return True
+        except FileNotFoundError:
+            # Klasör henüz yok
             ensure_directories()
-            
-            # İçeriği oku ve yeni formata çevir
-            with open(PROXY_LIST_FILE, 'r', encoding='utf-8') as f:
-                old_proxies = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-            
-            # Yeni proxy pool dosyasına yaz
-            with open(PROXY_POOL_FILE, 'w', encoding='utf-8') as f:
-                f.write("# Proxy Pool - Ana proxy listesi\n")
-                f.write(f"# Toplam: {len(old_proxies)} proxy\n")
-                f.write("# Format: IP:PORT veya http://IP:PORT\n\n")
-                
-                for proxy in old_proxies:
-                    f.write(f"{proxy}\n")
-            
-            logger.info("Eski proxy_list.txt -> proxies/proxy_pool.txt'ye taşındı (%d proxy)", len(old_proxies))
-            
-            # Eski dosyayı yedekle
-            os.rename(PROXY_LIST_FILE, PROXY_LIST_FILE + ".backup")
-            
+            try:
+                fout = open(PROXY_POOL_FILE, 'x', encoding='utf-8')
+            except FileExistsError:
+                return True
+        
+        # Eski proxy_list.txt'yi oku ve yeni proxy pool dosyasına yaz
+        try:
+            with fout:
+                old_proxies = read_proxy_lines(PROXY_LIST_FILE)
+                fout.write("".join([
+                    "# Proxy Pool - Ana proxy listesi\n",
+                    f"# Toplam: {len(old_proxies)} proxy\n",
+                    "# Format: IP:PORT veya http://IP:PORT\n\n",
+                ]))
+                fout.writelines(f"{proxy}\n" for proxy in old_proxies)
+        except FileNotFoundError:
+            # Eski proxy_list.txt yok, taşınacak bir şey yok (boş pool dosyası bırakılmaz)
+            os.remove(PROXY_POOL_FILE)
+            return True
+        except BaseException:
+            # Yarım kalan pool dosyasını sil; aksi halde 'x' modu sonraki çalıştırmalarda taşımayı atlar
+            os.remove(PROXY_POOL_FILE)
+            raise
+        
+        logger.info("Eski proxy_list.txt -> proxies/proxy_pool.txt'ye taşındı (%d proxy)", len(old_proxies))
+        
+        # Eski dosyayı yedekle
+        os.replace(PROXY_LIST_FILE, f"{PROXY_LIST_FILE}.backup")
+        
         return True
         
     except Exception as e:
-        logger.error("Legacy proxy dosya taşıma hatası: %s", str(e))
+        logger.error("Legacy proxy dosya taşıma hatası: %s", e)
         return False
 
 
 def update_proxies_if_available():
     """update_proxies.py varsa çalıştırarak güncel proxy listesini güncelle"""
+    if ProxyUpdater is None:
+        logger.warning("update_proxies modülü yok, mevcut proxy'ler kullanılacak: %s", _proxy_updater_import_error)
+        return False
+    
     try:
-        # update_proxies.py dosyasının varlığını kontrol et
-        if not os.path.exists('update_proxies.py'):
-            logger.warning("update_proxies.py bulunamadı, mevcut proxy'ler kullanılacak")
-            return False
-        
         logger.info("Proxy güncelleme başlatılıyor...")
         print("Güncel proxy listesi alınıyor...")
         
-        # ProxyUpdater'ı import et ve çalıştır
-        from update_proxies import ProxyUpdater
-        
         updater = ProxyUpdater()
         success = updater.update_proxy_list(test_proxies=False)  # Test etmeyelim, background halleder
         
         if success:
             # Yeni proxy'leri proxy_pool.txt'ye ekle
-            if os.path.exists(PROXY_LIST_FILE):
-                with open(PROXY_LIST_FILE, 'r', encoding='utf-8') as f:
-                    new_proxies = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            try:
+                new_proxies = read_proxy_lines(PROXY_LIST_FILE)
+            except FileNotFoundError:
+                new_proxies = []
+            
+            # Mevcut proxy pool'a ekle
+            if new_proxies:
+                with open(PROXY_POOL_FILE, 'a', encoding='utf-8') as f:
+                    stamp = _format_time('%Y-%m-%d %H:%M:%S', int(time.time()))
+                    f.write(f"\n# Güncellenen proxy'ler - {stamp}\n" + "\n".join(new_proxies) + "\n")
                 
-                # Mevcut proxy pool'a ekle
-                if new_proxies:
-                    with open(PROXY_POOL_FILE, 'a', encoding='utf-8') as f:
-                        f.write(f"\n# Güncellenen proxy'ler - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        for proxy in new_proxies:
-                            f.write(f"{proxy}\n")
-                    
-                    logger.info("Proxy güncelleme başarılı - %d yeni proxy eklendi", len(new_proxies))
-                    
-                    # Eski dosyayı sil
-                    os.remove(PROXY_LIST_FILE)
+                logger.info("Proxy güncelleme başarılı - %d yeni proxy eklendi", len(new_proxies))
+                
+                # Eski dosyayı sil
+                os.remove(PROXY_LIST_FILE)
             
             return True
         else:
             logger.warning("Proxy güncelleme başarısız, mevcut proxy'ler kullanılacak")
             return False
             
-    except ImportError as e:
-        logger.warning("update_proxies modülü yok: %s", str(e))
-        return False
     except Exception as e:
-        logger.error("Proxy güncelleme sırasında hata: %s", str(e))
+        logger.error("Proxy güncelleme sırasında hata: %s", e)
         return False
 
 
 def send_telegram_notification(message):
     """Telegram bildirimi gönder"""
-    try:
-        # Telegram.py modülünden fonksiyonu çağır
-        from telegram import send_telegram
-        return send_telegram(message)
-    except ImportError:
+    with _telegram_lock:
+        return _send_telegram_notification(message)
+
+
+def _send_telegram_notification(message):
+    """Telegram bildirimini gönder (lock altında çağrılır)"""
+    if _send_telegram is None:
         logger.warning("Telegram modülü bulunamadı, konsola yazdırılıyor")
         print(f"TELEGRAM: {message}")
         return True
+    
+    try:
+        return _send_telegram(message)
     except Exception as e:
-        logger.error("Telegram gönderim hatası: %s", str(e))
+        logger.error("Telegram gönderim hatası: %s", e)
         return False
 
 
+def countdown_wait(seconds):
+    """Monotonic deadline'a kadar bekle, dakikalık countdown göster.
+    
+    Shutdown sinyali gelirse hemen True döner.
+    """
+    deadline = time.monotonic() + seconds
+    minutes_left = seconds // 60
+    print(f"⏳ {minutes_left} dakika kaldı...")
+    
+    # Ara countdown mesajları sadece terminalde gösterilir
+    if sys.stdout.isatty():
+        for minutes_left in range(minutes_left - 1, 0, -1):
+            next_mark = deadline - minutes_left * 60
+            if _shutdown.wait(timeout=max(0, next_mark - time.monotonic())):
+                return True
+            print(f"⏳ {minutes_left} dakika kaldı...")
+    
+    return _shutdown.wait(timeout=max(0, deadline - time.monotonic()))
+
+
+def run_checker(site_name, check_fn):
+    """Tek bir site checker'ını çalıştır, (sonuç, süre) döndür"""
+    check_start = time.time()
+    logger.info("%s kontrol ediliyor...", site_name)
+    result = check_fn()
+    return result, time.time() - check_start
+
+
 def check_proxy_system():
     """Proxy sisteminin durumunu kontrol et"""
     global proxy_manager
@@ -162,13 +244,12 @@ def check_proxy_system():
     
     # Proxy pool dosyası var mı?
     if not os.path.exists(PROXY_POOL_FILE):
-        logger.error(f"{PROXY_POOL_FILE} dosyası bulunamadı!")
+        logger.error("%s dosyası bulunamadı!", PROXY_POOL_FILE)
         print("❌ Proxy pool dosyası bulunamadı!")
         
-        # Eski proxy_list.txt var mı?
+        # Eski proxy_list.txt var mı? (taşıma yukarıda zaten denendi)
         if os.path.exists(PROXY_LIST_FILE):
-            print("💡 proxy_list.txt bulundu, taşınıyor...")
-            setup_legacy_proxy_files()
+            print("💡 proxy_list.txt bulundu ancak taşıma başarısız oldu, log'u kontrol edin")
         else:
             print("Çözüm önerileri:")
             print("1. 'python update_proxies.py' komutunu çalıştırın")
@@ -185,11 +266,9 @@ def check_proxy_system():
         logger.warning("Hiç geçerli proxy bulunamadı! Proxy güncelleme deneniyor...")
         print("⚠️ Hiç geçerli proxy yok, güncelleme deneniyor...")
         
-        # Proxy güncellemeyi dene
-        update_success = update_proxies_if_available()
-        
-        # Tekrar dene
-        valid_proxies = proxy_manager.load_valid_proxies()
+        # Proxy güncellemeyi dene, sadece başarılıysa tekrar yükle
+        if update_proxies_if_available():
+            valid_proxies = proxy_manager.load_valid_proxies()
         
         if not valid_proxies:
             logger.error("Proxy güncellemeden sonra hala hiç geçerli proxy yok!")
@@ -256,14 +335,15 @@ def main():
     
     # Checker nesnelerini oluştur
     logger.info("Site checker'ları başlatılıyor...")
-    checkers = {
-        'ABD Vize': USVisaChecker(),
-        'Almanya Vize': IdataChecker(),
-        'İtalya Vize': VFSGlobalChecker(),
-        'VFS Global': VFSGlobalMainChecker(),
-        'İspanya BLS': BLSSpainChecker(),
-        'Kanada Vize': CanadaVisaChecker()
-    }
+    # Her site için kontrol fonksiyonu kurulumda bir kez bağlanır
+    checkers = [
+        ('ABD Vize', USVisaChecker().check),
+        ('Almanya Vize', IdataChecker().check_appointments),
+        ('İtalya Vize', VFSGlobalChecker().check_appointments),
+        ('VFS Global', VFSGlobalMainChecker().check_appointments),
+        ('İspanya BLS', BLSSpainChecker().check_appointments),
+        ('Kanada Vize', CanadaVisaChecker().check_appointments),
+    ]
     
     print(f"✅ {len(checkers)} site checker hazır")
     print("🔄 Ana kontrol döngüsü başlatılıyor...")
@@ -277,10 +357,10 @@ def main():
             
             logger.info("=" * 50)
             logger.info("RANDEVU KONTROLÜ #%d başlatılıyor...", cycle_count)
-            print(f"\n🔍 Kontrol Döngüsü #{cycle_count} - {time.strftime('%H:%M:%S')}")
+            print(f"\n🔍 Kontrol Döngüsü #{cycle_count} - {_format_time('%H:%M:%S', int(time.time()))}")
             
-            # Hızlı proxy durumu
-            valid_proxies = proxy_manager.load_valid_proxies()
+            # Hızlı proxy durumu (in-memory cache, background updater günceller)
+            valid_proxies = proxy_manager.get_valid_proxies_cached()
             bg_status = proxy_manager.get_background_status()
             
             print(f"📊 Proxy: {len(valid_proxies)} geçerli, Background: {'🟢' if bg_status['running'] else '🔴'}")
@@ -291,42 +371,48 @@ def main():
                 time.sleep(30)
                 continue
             
-            # Her checker'ı çalıştır
+            # Tüm checker'ları paralel çalıştır (network-bound)
             results = {}
             
-            for site_name, checker in checkers.items():
-                try:
-                    check_start = time.time()
-                    logger.info("%s kontrol ediliyor...", site_name)
-                    
-                    # Site tipine göre farklı kontrol fonksiyonları
-                    if site_name == 'ABD Vize':
-                        result = checker.check()
-                    elif site_name in ['Almanya Vize', 'İtalya Vize']:
-                        result = checker.check_appointments()
-                    else:
-                        result = checker.check_appointments()
-                    
-                    check_duration = time.time() - check_start
-                    
-                    if result:
-                        logger.info("🎉 %s randevu bulundu! (%.1fs)", site_name, check_duration)
-                        print(f"🎉 {site_name} - RANDEVU BULUNDU!")
-                        
-                        # Telegram bildirimi
-                        message = f"🎉 {site_name} randevu bulundu!"
-                        if isinstance(result, str) and result != True:
-                            message += f"\n{result}"
-                        
-                        send_telegram_notification(message)
-                        results[site_name] = result
-                    else:
-                        logger.info("❌ %s randevu yok (%.1fs)", site_name, check_duration)
-                        print(f"❌ {site_name} - randevu yok (%.1fs)" % check_duration)
+            # 'with' yerine açık executor: shutdown sinyalinde __exit__ çalışan checker'ları
+            # (Playwright dahil) beklemesin diye kapanış wait=False ile yapılır
+            executor = ThreadPoolExecutor(max_workers=len(checkers), thread_name_prefix="Checker")
+            try:
+                futures = {
+                    executor.submit(run_checker, site_name, check_fn): site_name
+                    for site_name, check_fn in checkers
+                }
+                
+                for future in as_completed(futures):
+                    if _shutdown.is_set():
+                        break
+                    site_name = futures[future]
+                    try:
+                        result, check_duration = future.result()
                         
-                except Exception as e:
-                    logger.error("%s kontrolünde hata: %s", site_name, str(e))
-                    print(f"❌ {site_name} - HATA: {str(e)}")
+                        if result:
+                            logger.info("🎉 %s randevu bulundu! (%.1fs)", site_name, check_duration)
+                            print(f"🎉 {site_name} - RANDEVU BULUNDU!")
+                            
+                            # Telegram bildirimi
+                            message = f"🎉 {site_name} randevu bulundu!"
+                            if isinstance(result, str) and result != True:
+                                message += f"\n{result}"
+                            
+                            send_telegram_notification(message)
+                            results[site_name] = result
+                        else:
+                            logger.info("❌ %s randevu yok (%.1fs)", site_name, check_duration)
+                            print(f"❌ {site_name} - randevu yok (%.1fs)" % check_duration)
+                            
+                    except Exception as e:
+                        logger.error("%s kontrolünde hata: %s", site_name, e)
+                        print(f"❌ {site_name} - HATA: {str(e)}")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            if _shutdown.is_set():
+                break
             
             # Döngü süresi
             cycle_duration = time.time() - cycle_start
@@ -351,19 +437,15 @@ def main():
             # 5 dakika bekle (300 saniye)
             logger.info("5 dakika bekleniyor...")
             
-            # Güzel countdown
-            remaining = 300
-            while remaining > 0:
-                if remaining % 60 == 0:
-                    print(f"⏳ {remaining//60} dakika kaldı...")
-                time.sleep(60)
-                remaining -= 60
+            # Shutdown sinyali beklemeyi anında keser
+            if countdown_wait(300):
+                break
             
         except KeyboardInterrupt:
             logger.info("Kullanıcı tarafından durduruldu")
             break
         except Exception as e:
-            logger.error("Ana döngüde hata oluştu: %s", str(e))
+            logger.error("Ana döngüde hata oluştu: %s", e)
             send_telegram_notification(f"🚨 Bot genel hatası: {str(e)}")
             
             # Hata durumunda kısa bekle
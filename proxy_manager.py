@@ -5,7 +5,12 @@ Proxy Manager - Background Updater ile Optimize Edilmiş
 Her 1 dakikada proxy'leri test edip JSON cache'e yazar.
 """
 
+import asyncio
+import heapq
+import itertools
+from collections import OrderedDict
 import requests
+import socket
 import threading
 import time
 import json
@@ -13,15 +18,64 @@ import os
 import logging
 import random
 import concurrent.futures
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
+# aiohttp opsiyonel: varsa proxy testleri tek event loop'ta yapılır
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson opsiyonel: varsa JSON cache daha hızlı serialize edilir
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Path helper import et
 from config.paths import get_project_path, ensure_directories
 
 logger = logging.getLogger(__name__)
 
+# Büyük proxy dosyaları için okuma buffer'ı (daha az read syscall)
+READ_BUFFER_SIZE = 1 << 20
+
+# posix_fadvise sadece Linux/POSIX'te var (Windows'ta ipuçları atlanır)
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+
+def _fadvise(f, advice_name: str):
+    """Kernel'e dosya erişim deseni ipucu ver (desteklenmiyorsa sessizce geç)"""
+    if not _HAS_FADVISE:
+        return
+    try:
+        os.posix_fadvise(f.fileno(), 0, 0, getattr(os, advice_name))
+    except OSError:
+        pass
+
+
+def _dumps_json(data) -> bytes:
+    """JSON'u bytes olarak serialize et (orjson varsa onunla)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads_json(raw: bytes):
+    """Bytes JSON'u parse et (orjson varsa onunla)"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _write_file_atomic(path, data: bytes):
+    """Geçici dosyaya yaz + atomik rename: yarım yazılmış dosya okunmaz"""
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
 class ProxyManager:
     """Proxy pool ve blacklist yönetimi - Background updater ile"""
     
@@ -34,38 +88,107 @@ class ProxyManager:
         self.working_proxies_file = working_proxies_file or get_project_path("proxies", "working_proxies.txt")
         self.valid_proxy_pool_file = valid_proxy_pool_file or get_project_path("proxies", "proxy_pool.json")
         
+        # Blacklist'ten çıkarılan proxy'ler (append-only, periyodik compaction ile temizlenir)
+        self.blacklist_tombstones_file = f"{os.path.splitext(self.blacklist_file)[0]}_tombstones.txt"
+        
+        # Proxy test zamanları (cooldown restart'lar arasında korunur)
+        self.cooldown_file = os.path.join(os.path.dirname(self.valid_proxy_pool_file), "cooldown.json")
+        
         # Gerekli dizinleri oluştur
         ensure_directories()
         
         # Timeout ayarları - daha agresif
         self.test_timeout = 3  # 7'den 3'e düşürüldü
+        self.tcp_probe_timeout = 1  # HTTP öncesi TCP erişilebilirlik kontrolü
         self.max_failures = 1  # Bir başarısızlıkta blacklist'e al
         self.test_batch_size = 15  # Daha fazla proxy paralel test et
+        self.async_test_limit = 320  # aiohttp ile eşzamanlı test limiti
+        
+        # Test endpoint'leri (rate limit'e takılmamak için sırayla kullanılır)
+        self._test_urls = ('http://httpbin.org/ip', 'http://icanhazip.com/', 'http://ifconfig.me/ip')
+        self._test_url_cycle = itertools.cycle(self._test_urls)
         
         # Background updater ayarları
         self._background_thread = None
-        self._stop_background = False
+        self._stop_event = threading.Event()
         self._update_interval = 60  # 60 saniye
         self._test_cooldown = 300  # 5 dakika cooldown
-        self._last_tested_proxies = {}  # proxy_url: last_test_time
+        self._last_tested_proxies = OrderedDict()  # proxy_url: last_test_time (LRU)
+        self._max_cooldown_entries = 10_000
+        self._cooldown_heap = []  # (last_test_time, proxy_url) min-heap
         self.last_update_time = 0
         
         # Thread-safe operations için lock
         self._lock = threading.Lock()
         
+        self._load_cooldowns()
+        
+        # Proxy testleri için kalıcı session (TCP/TLS bağlantıları yeniden kullanılır)
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.test_batch_size,
+            pool_maxsize=self.test_batch_size,
+            max_retries=0
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # get_stats sonucu kısa süreli cache'lenir: (timestamp, stats)
+        self._stats_ttl = 5.0
+        self._stats_cache = (0.0, None)
+        
+        # In-memory blacklist set'i (dosya dışarıdan değişirse mtime ile yeniden yüklenir)
+        self._blacklist_lock = threading.RLock()
+        self._blacklist_set = None
+        self._blacklist_tombstones = set()
+        self._blacklist_mtime = None
+        self._blacklist_compact_interval = 10  # Background updater döngüsü
+        
+        # JSON cache geçerlilik süresi (saniye)
+        self._valid_cache_ttl = 300
+        
+        # Parse edilmiş proxy pool'u: ((st_mtime_ns, st_size), set) - dosya değişmediyse yeniden okunmaz
+        self._pool_cache = (None, frozenset())
+        
+        # In-memory geçerli proxy cache'i (background updater günceller)
+        self._cache_lock = threading.RLock()
+        self._valid_proxies_cache = None
+        self._cache_generation = 0
+        
         logger.info("ProxyManager başlatıldı - Background updater sistemi ile")
     
-    def load_valid_proxies(self) -> List[str]:
-        """Geçerli proxy'leri yükle (önce JSON cache, sonra blacklist hariç)"""
+    def load_valid_proxies(self, reload: bool = True) -> List[str]:
+        """Geçerli proxy'leri yükle (önce JSON cache, sonra blacklist hariç)
+        
+        reload=False ise in-memory cache doluysa dosyalar tekrar okunmaz
+        (boş liste cache sayılmaz, dosyadan tekrar denenir).
+        """
+        if not reload:
+            with self._cache_lock:
+                if self._valid_proxies_cache:
+                    return self._valid_proxies_cache
+        
+        valid_proxies = self._load_valid_proxies_from_disk()
+        self._set_valid_proxies_cache(valid_proxies)
+        return valid_proxies
+    
+    def _load_valid_proxies_from_disk(self) -> List[str]:
+        """JSON cache veya pool/blacklist dosyalarından geçerli proxy'leri oku"""
         try:
             # 1. JSON cache'den dene (hızlı)
-            if os.path.exists(self.valid_proxy_pool_file):
-                with open(self.valid_proxy_pool_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
+            try:
+                with open(self.valid_proxy_pool_file, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                raw = None
+            
+            if raw is not None:
+                cached_data = _loads_json(raw)
                 
                 # Cache yaşını kontrol et (5 dakikadan eski değilse kullan)
-                cache_time = datetime.fromisoformat(cached_data.get('last_updated', '2000-01-01'))
-                if datetime.now() - cache_time < timedelta(minutes=5):
+                # Epoch alanı olmayan eski cache dosyaları eski kabul edilir
+                cache_epoch = cached_data.get('last_updated_epoch', 0)
+                if time.time() - cache_epoch < self._valid_cache_ttl:
                     valid_proxies = cached_data.get('valid_proxies', [])
                     logger.debug("JSON cache'den proxy'ler yüklendi: %d adet", len(valid_proxies))
                     return valid_proxies
@@ -79,29 +202,30 @@ class ProxyManager:
             logger.error("Proxy yükleme hatası: %s", str(e))
             return self._calculate_valid_proxies()
     
+    def get_valid_proxies_cached(self) -> List[str]:
+        """In-memory cache'ten geçerli proxy'leri döndür (dosya sadece cache boşsa okunur)"""
+        return self.load_valid_proxies(reload=False)
+    
+    def _set_valid_proxies_cache(self, valid_proxies: Optional[List[str]]):
+        """In-memory cache'i güncelle ve generation sayacını artır"""
+        with self._cache_lock:
+            self._valid_proxies_cache = valid_proxies
+            self._cache_generation += 1
+    
+    @property
+    def cache_generation(self) -> int:
+        """In-memory cache her güncellendiğinde artan sayaç"""
+        return self._cache_generation
+    
     def _calculate_valid_proxies(self) -> List[str]:
         """Proxy pool'dan blacklist'i çıkararak geçerli proxy'leri hesapla"""
         try:
-            # Proxy pool'u yükle
-            pool = set()
-            if os.path.exists(self.proxy_pool_file):
-                with open(self.proxy_pool_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            pool.add(line)
-            
-            # Blacklist'i yükle
-            blacklist = set()
-            if os.path.exists(self.blacklist_file):
-                with open(self.blacklist_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            # Sadece proxy URL kısmını al (comment kısmını çıkar)
-                            proxy_url = line.split('#')[0].strip()
-                            if proxy_url:
-                                blacklist.add(proxy_url)
+            # Proxy pool'u yükle (dosya değişmediyse cache'ten)
+            pool = self._get_pool_set()
+            
+            # Blacklist'i yükle (in-memory set, gerekirse dosyadan)
+            with self._blacklist_lock:
+                blacklist = set(self._get_blacklist_set())
             
             # Geçerli proxy'leri döndür (pool - blacklist)
             valid_proxies = list(pool - blacklist)
@@ -115,51 +239,208 @@ class ProxyManager:
             logger.error("Proxy hesaplama hatası: %s", str(e))
             return []
     
+    def _load_cooldowns(self):
+        """Diskteki test zamanlarını yükle (cooldown'u dolmuş kayıtlar atlanır)"""
+        try:
+            with open(self.cooldown_file, 'rb') as f:
+                raw = f.read()
+            entries = _loads_json(raw)
+            if not isinstance(entries, dict):
+                raise ValueError("beklenen JSON nesnesi, gelen: %s" % type(entries).__name__)
+            
+            cutoff = time.time() - self._test_cooldown
+            recent = []
+            skipped = 0
+            for proxy_url, last_test in entries.items():
+                # Bozuk kayıtlar (sayı olmayan zaman damgası) tek tek atlanır
+                if isinstance(last_test, bool) or not isinstance(last_test, (int, float)):
+                    skipped += 1
+                    continue
+                if last_test > cutoff:
+                    recent.append((float(last_test), proxy_url))
+            recent.sort()
+            recent = recent[-self._max_cooldown_entries:]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            # Boş cooldown haritasıyla devam edilir
+            logger.warning("Cooldown dosyası okunamadı: %s", e)
+            return
+        
+        if skipped:
+            logger.warning("Cooldown dosyasında %d bozuk kayıt atlandı", skipped)
+        
+        with self._lock:
+            # En eski test başta: LRU sırası ve heap sırası aynı
+            self._last_tested_proxies = OrderedDict((proxy_url, last_test) for last_test, proxy_url in recent)
+            self._cooldown_heap = recent
+        
+        logger.debug("Cooldown kayıtları yüklendi: %d proxy", len(recent))
+    
     def _save_valid_proxy_cache(self, valid_proxies: List[str], tested_proxies: List[str] = None):
         """Geçerli proxy'leri JSON cache'e kaydet"""
         try:
             cache_data = {
                 'last_updated': datetime.now().isoformat(),
+                'last_updated_epoch': time.time(),
                 'valid_proxies': valid_proxies,
                 'tested_count': len(tested_proxies) if tested_proxies else 0,
                 'total_pool_count': len(valid_proxies)
             }
             
+            data = _dumps_json(cache_data)
+            
             with self._lock:
-                with open(self.valid_proxy_pool_file, 'w', encoding='utf-8') as f:
-                    json.dump(cache_data, f, indent=2, ensure_ascii=False)
+                _write_file_atomic(self.valid_proxy_pool_file, data)
+                # Test zamanları da kaydedilir (restart sonrası cooldown korunur)
+                cooldown_data = _dumps_json(dict(self._last_tested_proxies))
+            _write_file_atomic(self.cooldown_file, cooldown_data)
+            
+            self._set_valid_proxies_cache(valid_proxies)
             
             logger.info("Proxy cache güncellendi: %d geçerli proxy", len(valid_proxies))
             
         except Exception as e:
             logger.error("Proxy cache kaydetme hatası: %s", str(e))
     
-    def add_to_blacklist(self, proxy_url: str, reason: str = "Failed"):
-        """Proxy'yi blacklist'e ekle"""
+    @staticmethod
+    def _get_file_mtime(path) -> Optional[int]:
+        """Dosyanın mtime'ı (dosya yoksa None)"""
         try:
-            # Blacklist'te zaten var mı kontrol et
-            existing_blacklist = set()
-            if os.path.exists(self.blacklist_file):
-                with open(self.blacklist_file, 'r', encoding='utf-8') as f:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _get_file_signature(path) -> Optional[Tuple[int, int]]:
+        """Dosyanın (mtime, boyut) imzası (dosya yoksa None)"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _get_pool_set(self) -> frozenset:
+        """Proxy pool set'ini döndür; dosya imzası değişmediyse parse edilmiş hali kullanılır"""
+        signature = self._get_file_signature(self.proxy_pool_file)
+        cached_signature, pool = self._pool_cache
+        if signature is not None and signature == cached_signature:
+            return pool
+        
+        data = b''
+        if signature is not None:
+            with open(self.proxy_pool_file, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                _fadvise(f, 'POSIX_FADV_SEQUENTIAL')
+                data = f.read()
+                # Parse edilen sayfalar bir sonraki değişikliğe kadar tekrar okunmaz
+                _fadvise(f, 'POSIX_FADV_DONTNEED')
+        
+        # Satır bazlı işlemler bytes üzerinde, decode sadece geçerli satırlar için
+        pool = frozenset(
+            line.decode('utf-8')
+            for line in map(bytes.strip, data.splitlines())
+            if line and not line.startswith(b'#')
+        )
+        self._pool_cache = (signature, pool)
+        return pool
+    
+    def _get_blacklist_mtime(self) -> Tuple[Optional[int], Optional[int]]:
+        """Blacklist ve tombstone dosyalarının mtime'ları"""
+        return (self._get_file_mtime(self.blacklist_file),
+                self._get_file_mtime(self.blacklist_tombstones_file))
+    
+    @staticmethod
+    def _read_blacklist_entries(path) -> set:
+        """Blacklist formatındaki dosyadan proxy URL'lerini oku (dosya yoksa boş set)"""
+        try:
+            with open(path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                _fadvise(f, 'POSIX_FADV_SEQUENTIAL')
+                data = f.read()
+                _fadvise(f, 'POSIX_FADV_DONTNEED')
+        except FileNotFoundError:
+            return set()
+        
+        # Sadece proxy URL kısmını al (comment kısmını ve comment satırlarını çıkar)
+        return {
+            proxy_url.decode('utf-8')
+            for proxy_url in (line.split(b'#', 1)[0].strip() for line in data.splitlines())
+            if proxy_url
+        }
+    
+    def _get_blacklist_set(self) -> set:
+        """In-memory blacklist set'ini döndür (_blacklist_lock altında çağrılmalı)
+        
+        İlk çağrıda veya dosyalar dışarıdan değiştiyse yeniden yüklenir;
+        tombstone dosyasındaki proxy'ler blacklist'ten düşülür.
+        """
+        mtime = self._get_blacklist_mtime()
+        if self._blacklist_set is None or mtime != self._blacklist_mtime:
+            tombstones = self._read_blacklist_entries(self.blacklist_tombstones_file)
+            self._blacklist_set = self._read_blacklist_entries(self.blacklist_file) - tombstones
+            self._blacklist_tombstones = tombstones
+            self._blacklist_mtime = mtime
+        
+        return self._blacklist_set
+    
+    def _compact_blacklist(self) -> bool:
+        """Tombstone'lanmış proxy'leri blacklist.txt'den sil ve tombstone dosyasını boşalt"""
+        with self._blacklist_lock:
+            self._get_blacklist_set()
+            tombstones = self._blacklist_tombstones
+            if not tombstones:
+                return False
+            
+            lines = []
+            try:
+                with open(self.blacklist_file, 'r', encoding='utf-8', buffering=READ_BUFFER_SIZE) as f:
                     for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            existing_blacklist.add(line.split('#')[0].strip())
+                        line_stripped = line.strip()
+                        if line_stripped and not line_stripped.startswith('#'):
+                            if line_stripped.split('#')[0].strip() in tombstones:
+                                continue
+                        lines.append(line)
+            except FileNotFoundError:
+                pass
             
-            # Yeni proxy'yi ekle
-            if proxy_url not in existing_blacklist:
+            with self._lock:
+                # Önce blacklist atomik yazılır; tombstone dosyası sadece replace başarılıysa boşaltılır
+                _write_file_atomic(self.blacklist_file, "".join(lines).encode('utf-8'))
+                with open(self.blacklist_tombstones_file, 'w', encoding='utf-8'):
+                    pass
+            
+            logger.debug("Blacklist compaction: %d tombstone temizlendi", len(tombstones))
+            self._blacklist_tombstones = set()
+            self._blacklist_mtime = self._get_blacklist_mtime()
+            return True
+    
+    def add_to_blacklist(self, proxy_url: str, reason: str = "Failed"):
+        """Proxy'yi blacklist'e ekle"""
+        try:
+            with self._blacklist_lock:
+                # Blacklist'te zaten var mı kontrol et (in-memory)
+                blacklist = self._get_blacklist_set()
+                if proxy_url in blacklist:
+                    logger.debug("Proxy zaten blacklist'te: %s", proxy_url)
+                    return False
+                
+                # Daha önce çıkarılmışsa tombstone'u önce temizle
+                if proxy_url in self._blacklist_tombstones:
+                    self._compact_blacklist()
+                    blacklist = self._get_blacklist_set()
+                
+                # Yeni proxy'yi ekle
                 with self._lock:
                     with open(self.blacklist_file, 'a', encoding='utf-8') as f:
                         f.write(f"{proxy_url}  # {reason} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 
-                logger.warning("BLACKLIST'E EKLENDİ: %s (Sebep: %s)", proxy_url, reason)
-                
-                # Cache'i invalidate et
-                self._invalidate_cache()
-                return True
-            else:
-                logger.debug("Proxy zaten blacklist'te: %s", proxy_url)
-                return False
+                blacklist.add(proxy_url)
+                self._blacklist_mtime = self._get_blacklist_mtime()
+            
+            logger.warning("BLACKLIST'E EKLENDİ: %s (Sebep: %s)", proxy_url, reason)
+            
+            # Cache'i invalidate et
+            self._invalidate_cache()
+            return True
                 
         except Exception as e:
             logger.error("Blacklist ekleme hatası: %s", str(e))
@@ -167,44 +448,40 @@ class ProxyManager:
     
     def _invalidate_cache(self):
         """Proxy cache'ini invalidate et"""
+        self._set_valid_proxies_cache(None)
+        self._stats_cache = (0.0, None)
         try:
-            if os.path.exists(self.valid_proxy_pool_file):
-                os.remove(self.valid_proxy_pool_file)
-                logger.debug("Proxy cache invalidate edildi")
+            os.remove(self.valid_proxy_pool_file)
+            logger.debug("Proxy cache invalidate edildi")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.debug("Cache invalidate hatası: %s", str(e))
     
     def remove_from_blacklist(self, proxy_url: str):
         """Proxy'yi blacklist'ten çıkar"""
         try:
-            if not os.path.exists(self.blacklist_file):
-                return False
-            
-            # Tüm satırları oku
-            lines = []
-            removed = False
-            
-            with open(self.blacklist_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line_stripped = line.strip()
-                    # Proxy URL'si bu satırda var mı?
-                    if line_stripped and not line_stripped.startswith('#'):
-                        if proxy_url in line_stripped:
-                            removed = True
-                            logger.info("BLACKLIST'TEN ÇIKARILDI: %s", proxy_url)
-                            continue
-                    lines.append(line)
-            
-            # Dosyayı yeniden yaz
-            if removed:
+            with self._blacklist_lock:
+                # Eşleşen kayıtları in-memory set'ten bul (dosya okunmaz)
+                blacklist = self._get_blacklist_set()
+                matches = [entry for entry in blacklist if proxy_url in entry]
+                if not matches:
+                    return False
+                
+                # Tam dosyayı yeniden yazmak yerine tombstone olarak ekle
                 with self._lock:
-                    with open(self.blacklist_file, 'w', encoding='utf-8') as f:
-                        f.writelines(lines)
+                    with open(self.blacklist_tombstones_file, 'a', encoding='utf-8') as f:
+                        f.writelines(f"{entry}\n" for entry in matches)
                 
-                # Cache'i invalidate et
-                self._invalidate_cache()
+                blacklist.difference_update(matches)
+                self._blacklist_tombstones.update(matches)
+                self._blacklist_mtime = self._get_blacklist_mtime()
             
-            return removed
+            logger.info("BLACKLIST'TEN ÇIKARILDI: %s", proxy_url)
+            
+            # Cache'i invalidate et
+            self._invalidate_cache()
+            return True
             
         except Exception as e:
             logger.error("Blacklist çıkarma hatası: %s", str(e))
@@ -225,21 +502,47 @@ class ProxyManager:
         except Exception as e:
             logger.error("Çalışan proxy kaydetme hatası: %s", str(e))
     
-    def test_and_filter_proxies(self, proxies: List[str], max_test: int = 5, respect_cooldown: bool = True) -> List[str]:
-        """Proxy'leri test et ve çalışanları döndür"""
-        import requests
+    def _rebuild_cooldown_heap(self):
+        """Heap'i _last_tested_proxies'ten yeniden oluştur (stale kayıtlar atılır; lock altında çağrılır)"""
+        self._cooldown_heap = [(last_test, proxy_url) for proxy_url, last_test in self._last_tested_proxies.items()]
+        heapq.heapify(self._cooldown_heap)
+    
+    def _select_cooldown_expired(self, proxies: List[str], max_test: int, current_time: float) -> List[str]:
+        """Cooldown'u dolmuş proxy'leri seç (önce hiç test edilmemişler, sonra en eski testler)"""
+        cutoff = current_time - self._test_cooldown
+        
+        with self._lock:
+            # Hiç test edilmemiş proxy'ler her zaman uygun (max_test tanesi bulununca durulur)
+            tested = self._last_tested_proxies
+            selected = list(itertools.islice((p for p in proxies if p not in tested), max_test))
+            
+            # Heap'ten en eski testleri al: O(k log N)
+            heap = self._cooldown_heap
+            candidates = None  # Üyelik seti sadece heap'e gerçekten bakılacaksa oluşturulur
+            while len(selected) < max_test and heap and heap[0][0] <= cutoff:
+                last_test, proxy_url = heapq.heappop(heap)
+                if tested.get(proxy_url) != last_test:
+                    continue  # Eski (stale) kayıt
+                if candidates is None:
+                    candidates = set(proxies)
+                if proxy_url not in candidates:
+                    # Cooldown'u zaten dolmuş; kaydı silmek "test edilmemiş" ile aynı anlama gelir
+                    del tested[proxy_url]
+                    continue
+                selected.append(proxy_url)
+        
+        return selected
+    
+    def test_and_filter_proxies(self, proxies: List[str], max_test: int = 5, respect_cooldown: bool = True,
+                                verify_content: bool = False) -> List[str]:
+        """Proxy'leri test et ve çalışanları döndür
         
+        Varsayılan olarak sadece erişilebilirlik için HEAD isteği atılır;
+        verify_content=True ise yanıt gövdesi de GET ile kontrol edilir.
+        """
         # Cooldown kontrolü ile proxy'leri filtrele
         if respect_cooldown:
-            test_proxies = []
-            current_time = time.time()
-            
-            for proxy_url in proxies:
-                last_test = self._last_tested_proxies.get(proxy_url, 0)
-                if current_time - last_test >= self._test_cooldown:
-                    test_proxies.append(proxy_url)
-                    if len(test_proxies) >= max_test:
-                        break
+            test_proxies = self._select_cooldown_expired(proxies, max_test, time.time())
         else:
             # Cooldown yok, random seç
             test_proxies = random.sample(proxies, min(len(proxies), max_test))
@@ -249,44 +552,127 @@ class ProxyManager:
             return []
         
         working_proxies = []
-        test_url = "http://httpbin.org/ip"
+        method = 'GET' if verify_content else 'HEAD'
         current_time = time.time()
         
+        # Test zamanlarını toplu kaydet
+        with self._lock:
+            for proxy_url in test_proxies:
+                self._last_tested_proxies[proxy_url] = current_time
+                self._last_tested_proxies.move_to_end(proxy_url)
+                heapq.heappush(self._cooldown_heap, (current_time, proxy_url))
+            # En eski kayıtları at; heap'teki karşılıkları stale olarak atlanır
+            while len(self._last_tested_proxies) > self._max_cooldown_entries:
+                self._last_tested_proxies.popitem(last=False)
+            # Stale kayıtlar birikince heap'i güncel kayıtlardan yeniden kur (sınırsız büyümesin)
+            if len(self._cooldown_heap) > 2 * len(self._last_tested_proxies) + max_test:
+                self._rebuild_cooldown_heap()
+        
         logger.info("Proxy test başlatıldı: %d proxy test edilecek", len(test_proxies))
         
-        for proxy_url in test_proxies:
-            try:
-                # Test zamanını kaydet
-                self._last_tested_proxies[proxy_url] = current_time
-                
-                # Proxy formatını düzenle
-                if not proxy_url.startswith('http://'):
-                    proxy_dict = {'http': f'http://{proxy_url}', 'https': f'http://{proxy_url}'}
-                else:
-                    proxy_dict = {'http': proxy_url, 'https': proxy_url}
-                
-                # Test et
-                response = requests.get(test_url, proxies=proxy_dict, timeout=3)
+        # Proxy'leri paralel test et (I/O-bound, toplam süre ~ en yavaş test)
+        if aiohttp is not None:
+            working_proxies = asyncio.run(self._async_test_proxies(test_proxies, method))
+        else:
+            # Proxy dict'leri submit öncesi tek seferde hazırla
+            proxy_dicts = [
+                (proxy_url, dict.fromkeys(('http', 'https'), self._normalize_test_proxy(proxy_url)))
+                for proxy_url in test_proxies
+            ]
+            
+            max_workers = min(self.test_batch_size, len(test_proxies))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._test_proxy, proxy_url, proxy_dict, method): proxy_url
+                    for proxy_url, proxy_dict in proxy_dicts
+                }
                 
-                if response.status_code == 200:
-                    working_proxies.append(proxy_url)
-                    logger.debug("✅ Proxy çalışıyor: %s", proxy_url)
-                else:
-                    logger.debug("❌ Proxy HTTP error %d: %s", response.status_code, proxy_url)
-                    
-            except Exception as e:
-                logger.debug("❌ Proxy test hatası %s: %s", proxy_url, str(e))
+                for future in concurrent.futures.as_completed(futures):
+                    if future.result():
+                        working_proxies.append(futures[future])
         
         logger.info("Proxy test tamamlandı: %d/%d çalışıyor", len(working_proxies), len(test_proxies))
         return working_proxies
     
+    @staticmethod
+    def _normalize_test_proxy(proxy_url: str) -> str:
+        """Test için proxy URL'ini http:// şemalı hale getir"""
+        return proxy_url if proxy_url.startswith('http://') else f'http://{proxy_url}'
+    
+    def _proxy_address(self, proxy_url: str) -> Tuple[str, int]:
+        """Proxy URL'inden (host, port) çıkar"""
+        parsed = urlparse(self._normalize_test_proxy(proxy_url))
+        return parsed.hostname, parsed.port or 80
+    
+    def _tcp_alive(self, proxy_url: str) -> bool:
+        """Proxy'ye TCP bağlantısı kurulabiliyor mu (HTTP katmanına girmeden)"""
+        try:
+            with socket.create_connection(self._proxy_address(proxy_url), timeout=self.tcp_probe_timeout):
+                return True
+        except (OSError, ValueError):
+            return False
+    
+    def _test_proxy(self, proxy_url: str, proxy_dict: Dict[str, str], method: str = 'HEAD') -> bool:
+        """Tek bir proxy'yi test et, çalışıyorsa True döndür"""
+        # TCP seviyesinde ölü proxy'ler için HTTP stack'ine hiç girme
+        if not self._tcp_alive(proxy_url):
+            logger.debug("❌ Proxy TCP bağlantısı yok: %s", proxy_url)
+            return False
+        
+        try:
+            response = self._session.request(method, next(self._test_url_cycle), proxies=proxy_dict,
+                                             timeout=self.test_timeout, allow_redirects=False)
+            
+            if response.status_code == 200 and (method == 'HEAD' or response.content):
+                logger.debug("✅ Proxy çalışıyor: %s", proxy_url)
+                return True
+            
+            logger.debug("❌ Proxy HTTP error %d: %s", response.status_code, proxy_url)
+            return False
+                
+        except Exception as e:
+            logger.debug("❌ Proxy test hatası %s: %s", proxy_url, str(e))
+            return False
+    
+    async def _async_test_proxies(self, test_proxies: List[str], method: str = 'HEAD') -> List[str]:
+        """Proxy'leri aiohttp ile tek event loop'ta test et, çalışanları döndür"""
+        connector = aiohttp.TCPConnector(limit=self.async_test_limit, ttl_dns_cache=300)
+        # Ayrı TCP ön kontrolü yerine aiohttp'nin bağlantı timeout'u: ölü proxy'ler yine
+        # tcp_probe_timeout içinde elenir, proxy başına tek bağlantı açılır
+        timeout = aiohttp.ClientTimeout(total=self.test_timeout, sock_connect=self.tcp_probe_timeout)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            
+            async def probe(proxy_url: str) -> Optional[str]:
+                proxy = self._normalize_test_proxy(proxy_url)
+                try:
+                    async with session.request(method, next(self._test_url_cycle), proxy=proxy,
+                                               allow_redirects=False) as response:
+                        if response.status == 200 and (method == 'HEAD' or await response.read()):
+                            logger.debug("✅ Proxy çalışıyor: %s", proxy_url)
+                            return proxy_url
+                        logger.debug("❌ Proxy HTTP error %d: %s", response.status, proxy_url)
+                except Exception as e:
+                    logger.debug("❌ Proxy test hatası %s: %s", proxy_url, str(e))
+                return None
+            
+            results = await asyncio.gather(*(probe(proxy_url) for proxy_url in test_proxies))
+        
+        return [proxy_url for proxy_url in results if proxy_url]
+    
     def _background_proxy_updater(self):
         """Background thread'de çalışan proxy updater"""
         logger.info("🔄 Background proxy updater başlatıldı (Her %d saniyede)", self._update_interval)
         
-        while not self._stop_background:
+        cycle = 0
+        while not self._stop_event.is_set():
             try:
                 start_time = time.time()
+                cycle += 1
+                
+                # Blacklist tombstone'larını periyodik olarak diske yansıt
+                if cycle % self._blacklist_compact_interval == 0:
+                    self._compact_blacklist()
                 
                 # Geçerli proxy'leri al
                 valid_proxies = self._calculate_valid_proxies()
@@ -314,15 +700,12 @@ class ProxyManager:
                 elapsed = time.time() - start_time
                 sleep_time = max(0, self._update_interval - elapsed)
                 
-                # Stop signal kontrolü ile bekle
-                for _ in range(int(sleep_time)):
-                    if self._stop_background:
-                        break
-                    time.sleep(1)
+                # Stop signal gelene kadar bekle (anında uyanır)
+                self._stop_event.wait(timeout=sleep_time)
                 
             except Exception as e:
                 logger.error("Background proxy updater hatası: %s", str(e))
-                time.sleep(self._update_interval)
+                self._stop_event.wait(timeout=self._update_interval)
         
         logger.info("🛑 Background proxy updater durduruldu")
     
@@ -332,7 +715,7 @@ class ProxyManager:
             logger.warning("Background proxy updater zaten çalışıyor")
             return False
         
-        self._stop_background = False
+        self._stop_event.clear()
         self._background_thread = threading.Thread(
             target=self._background_proxy_updater,
             name="ProxyUpdater",
@@ -349,7 +732,7 @@ class ProxyManager:
             logger.warning("Background proxy updater zaten durmuş")
             return False
         
-        self._stop_background = True
+        self._stop_event.set()
         
         # Thread'in bitmesini bekle (max 5 saniye)
         self._background_thread.join(timeout=5)
@@ -372,27 +755,25 @@ class ProxyManager:
         }
     
     def get_stats(self) -> dict:
-        """Proxy istatistiklerini döndür"""
+        """Proxy istatistiklerini döndür (kısa TTL ile cache'lenir)"""
+        now = time.monotonic()
+        cached_at, cached_stats = self._stats_cache
+        if cached_stats and now - cached_at < self._stats_ttl:
+            return cached_stats
+        
         try:
-            pool_count = 0
-            blacklist_count = 0
-            
-            # Pool sayısı
-            if os.path.exists(self.proxy_pool_file):
-                with open(self.proxy_pool_file, 'r', encoding='utf-8') as f:
-                    pool_count = sum(1 for line in f if line.strip() and not line.startswith('#'))
-            
-            # Blacklist sayısı
-            if os.path.exists(self.blacklist_file):
-                with open(self.blacklist_file, 'r', encoding='utf-8') as f:
-                    blacklist_count = sum(1 for line in f if line.strip() and not line.startswith('#'))
-            
-            valid_count = len(self.load_valid_proxies())
+            # Sayılar mtime korumalı in-memory set'lerden (dosyalar değişmediyse I/O yok)
+            pool = self._get_pool_set()
+            with self._blacklist_lock:
+                blacklist = self._get_blacklist_set()
+                blacklist_count = len(blacklist)
+                valid_count = len(pool) - len(pool & blacklist)
+            pool_count = len(pool)
             
             # Background status
             bg_status = self.get_background_status()
             
-            return {
+            stats = {
                 'pool_total': pool_count,
                 'blacklisted': blacklist_count,
                 'valid_proxies': valid_count,
@@ -402,6 +783,9 @@ class ProxyManager:
                 'cache_available': bg_status['cache_exists']
             }
             
+            self._stats_cache = (now, stats)
+            return stats
+            
         except Exception as e:
             logger.error("İstatistik hatası: %s", str(e))
             return {}
@@ -5,9 +5,31 @@ Sites Package
 Çeşitli vize sitelerinin randevu kontrolü için modüller.
 """
 
-from .usvisa import USVisaChecker
-from .idata import IdataChecker  
-from .vfsglobal import VFSGlobalChecker
-from .vfsglobal_main import VFSGlobalMainChecker
-from .blsspainvisa import BLSSpainChecker
-from .canadavisa import CanadaVisaChecker 
\ No newline at end of file
+import importlib
+
+# Checker sınıfları ilk erişimde yüklenir (PEP 562): tek bir site modülünü
+# import etmek diğer tüm checker'ların bağımlılıklarını yüklemez.
+_LAZY_CHECKERS = {
+    'USVisaChecker': 'usvisa',
+    'IdataChecker': 'idata',
+    'VFSGlobalChecker': 'vfsglobal',
+    'VFSGlobalMainChecker': 'vfsglobal_main',
+    'BLSSpainChecker': 'blsspainvisa',
+    'CanadaVisaChecker': 'canadavisa',
+}
+
+__all__ = list(_LAZY_CHECKERS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_CHECKERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
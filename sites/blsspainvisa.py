@@ -5,16 +5,41 @@
 İspanya vize randevularını BLS sistemi üzerinden kontrol eder.
 """
 
+import asyncio
+import atexit
+import codecs
+import itertools
 import requests
+import socket
+import threading
 import json
 import logging
+import math
+import mmap
 import time
 import random
 import re
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# selectolax opsiyonel: varsa HTML C parser ile parse edilir, yoksa BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# aiohttp opsiyonel: varsa şehirler eşzamanlı kontrol edilir
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 # Path helper import et
 import sys
@@ -25,39 +50,428 @@ from config.browser_headers import BrowserHeaders, get_anti_bot_headers
 
 logger = logging.getLogger(__name__)
 
+# Türkiye BLS Spain Visa merkezleri
+LOCATIONS = {
+    'ankara': {
+        'url': 'https://turkey.blsspainvisa.com/ankara/english/',
+        'name': 'BLS İspanya Vize Merkezi Ankara'
+    },
+    'istanbul': {
+        'url': 'https://turkey.blsspainvisa.com/istanbul/english/',
+        'name': 'BLS İspanya Vize Merkezi İstanbul'
+    }
+}
+
+# IP adresi formatı (proxy normalize ederken oktet kontrolü için)
+_IP_RE = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
+
+# Proxy formatı: [scheme://][user[:pass]@]host:port[/] ('#' ile başlayan yorum satırı proxy değildir)
+_PROXY_PATTERN = (
+    r'(?!#)'
+    r'(?:(?P<scheme>https?)://)?'
+    r'(?:(?P<username>[^:@\s]+)(?::(?P<password>[^@\s]*))?@)?'
+    r'(?P<host>[^:@/\s]+):(?P<port>\d{1,5})/?'
+)
+
+# Tek proxy satırı (normalize için)
+_PROXY_RE = re.compile(_PROXY_PATTERN + r'$')
+
+# proxy_list.txt satırı: geçerli proxy formatı veya (boş/yorum olmayan) hatalı satır
+_PROXY_LINE_PATTERN = r'^[ \t]*(?:' + _PROXY_PATTERN + r'|(?P<invalid>[^#\s].*?))[ \t\r]*$'
+_PROXY_LINE_RE = re.compile(_PROXY_LINE_PATTERN, re.M)
+# Aynı kaynaktan derlenen byte versiyonu (mmap'lenmiş dosya üzerinde decode etmeden tarama için)
+_PROXY_LINE_BYTES_RE = re.compile(_PROXY_LINE_PATTERN.encode(), re.M)
+_NEWLINE_BYTES_RE = re.compile(rb'\n')
+
+# Randevu yokluğu ifadeleri
+NO_APPOINTMENT_PHRASES = (
+    'no appointments available',
+    'randevu yok',
+    'hiç randevu yok',
+    'müsait randevu yok',
+    'appointment not available',
+    'no slots available',
+    'fully booked',
+    'no available dates',
+)
+
+# Randevu var ifadeleri
+APPOINTMENT_AVAILABLE_PHRASES = (
+    'book appointment',
+    'randevu al',
+    'appointment available',
+    'available dates',
+    'select date',
+    'tarih seçin',
+)
+
+# Aho-Corasick automaton (opsiyonel, pyahocorasick kuruluysa sayfa metni tek geçişte taranır)
+try:
+    import ahocorasick
+
+    _PHRASE_AUTOMATON = ahocorasick.Automaton()
+    for _phrase in NO_APPOINTMENT_PHRASES:
+        _PHRASE_AUTOMATON.add_word(_phrase, 'no')
+    for _phrase in APPOINTMENT_AVAILABLE_PHRASES:
+        _PHRASE_AUTOMATON.add_word(_phrase, 'yes')
+    _PHRASE_AUTOMATON.make_automaton()
+except ImportError:
+    _PHRASE_AUTOMATON = None
+
+
+def _scan_phrases(page_text: str) -> set:
+    """Küçük harfli sayfa metninde bulunan ifade kategorilerini döndür ('no' / 'yes')"""
+    if _PHRASE_AUTOMATON is not None:
+        return {category for _, category in _PHRASE_AUTOMATON.iter(page_text)}
+
+    categories = set()
+    if any(phrase in page_text for phrase in NO_APPOINTMENT_PHRASES):
+        categories.add('no')
+    if any(phrase in page_text for phrase in APPOINTMENT_AVAILABLE_PHRASES):
+        categories.add('yes')
+    return categories
+
+# Yanıt parça parça taranırken parça sınırına denk gelen ifadeler için taşınan karakter sayısı
+_PHRASE_OVERLAP = max(map(len, NO_APPOINTMENT_PHRASES + APPOINTMENT_AVAILABLE_PHRASES)) - 1
+RESPONSE_CHUNK_SIZE = 8192
+
+
+class _PhraseStreamScanner:
+    """HTTP yanıtını parça parça tarar; 'randevu yok' bulunursa okumayı bitirmeye gerek kalmaz"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._tail = ''
+        self._chunks = []
+        self.categories = set()
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parçayı tara; kesin sonuç (randevu yok) bulunduysa True döndür"""
+        self._chunks.append(chunk)
+        text = self._tail + self._decoder.decode(chunk).lower()
+        self.categories |= _scan_phrases(text)
+        self._tail = text[-_PHRASE_OVERLAP:]
+        return 'no' in self.categories
+
+    @property
+    def content(self) -> bytes:
+        """Şimdiye kadar okunan içerik"""
+        return b''.join(self._chunks)
+
+# Browser kontrolünde kullanılan ifadeler (İngilizce/Türkçe/İspanyolca)
+BROWSER_NO_APPOINTMENT_PHRASES = (
+    'no appointments available',
+    'appointment not available',
+    'randevu yok',
+    'hiç randevu yok',
+    'müsait randevu yok',
+    'no slots available',
+    'fully booked',
+    'no available dates',
+    'sin citas disponibles',
+    'keine termine verfügbar',
+    'pas de rendez-vous disponible',
+    'todos los horarios están ocupados',
+    'no hay fechas disponibles',
+)
+
+BROWSER_APPOINTMENT_AVAILABLE_PHRASES = (
+    'book appointment',
+    'randevu al',
+    'appointment available',
+    'available dates',
+    'select date',
+    'tarih seçin',
+    'choose date',
+    'pick a date',
+    'schedule appointment',
+    'reservar cita',
+    'seleccionar fecha',
+    'cita disponible',
+    'fechas disponibles',
+)
+
+# BLS spesifik randevu ifadeleri
+BLS_APPOINTMENT_PHRASES = (
+    'bls appointment',
+    'visa appointment',
+    'application appointment',
+    'biometric appointment',
+    'document submission',
+    'passport collection',
+    'vac appointment',
+)
+
+# Randevu sistemi göstergesi sayılan elementler (form, BLS elementleri, date picker)
+BROWSER_SYSTEM_SELECTOR = ', '.join((
+    'form', 'input[type="date"]', 'select', '.calendar', '[class*="calendar"]',
+    '[class*="appointment"]', 'button[class*="book"]', '[name*="date"]', '[id*="appointment"]',
+    '[class*="bls"]', '[id*="bls"]', '.appointment-form', '.booking-calendar',
+    '[class*="spain"]', '[class*="visa"]',
+    '.datepicker', '[class*="date"]', '.ui-datepicker', '[data-date]',
+))
+
+
+# JS regex literal'inde kaçırılması gereken karakterler
+_JS_REGEX_SPECIAL_RE = re.compile(r'[.*+?^${}()|[\]\\/]')
+
+
+def _js_regex(phrases) -> str:
+    """İfade listesinden tek geçişte test edilen bir JS regex literal'i oluştur"""
+    return '/' + '|'.join(_JS_REGEX_SPECIAL_RE.sub(r'\\\g<0>', phrase) for phrase in phrases) + '/'
+
+
+# Sayfa içinde randevu durumunu tespit eden script; context'e init script olarak bir kez
+# eklenir, her sayfada sadece window.__checkAppt() çağrılır
+_APPT_CHECK_JS = """window.__checkAppt = () => {
+    const bodyText = document.body.innerText.toLowerCase();
+    const titleText = document.title.toLowerCase();
+
+    // BLS Spain spesifik kontroller
+    const blsSpainChecks = {
+        hasBlsSpain: bodyText.includes('bls spain') || titleText.includes('bls spain'),
+        hasSpainVisa: /spain visa|visado españa/.test(bodyText),
+        hasSchengenVisa: bodyText.includes('schengen'),
+        hasTourismVisa: /tourism visa|turismo/.test(bodyText),
+        hasAppointmentBooking: /appointment booking|cita previa/.test(bodyText)
+    };
+
+    // İfade listeleri Python tarafında tek regex'e derlenir
+    const NO_APPOINTMENT_RE = __NO_APPOINTMENT_RE__;
+    const APPOINTMENT_AVAILABLE_RE = __APPOINTMENT_AVAILABLE_RE__;
+    const BLS_APPOINTMENT_RE = __BLS_APPOINTMENT_RE__;
+    const CLICKABLE_RE = /book appointment|schedule appointment|reserve appointment|cita previa|reservar cita/;
+    const API_ENDPOINT_RE = /\\/api\\/appointment|\\/booking\\/|appointment-api|bls-api|\\/calendar\\//;
+
+    // Form, BLS ve date picker elementleri tek selector ile; tıklanabilir metinler ve script'teki
+    // API endpoint'leri tek querySelectorAll geçişinde (ilk eşleşmede durur)
+    const hasSystemElements = () => {
+        if (document.querySelector('__SYSTEM_SELECTOR__') !== null) return true;
+        for (const el of document.querySelectorAll('div, span, a, button, script')) {
+            if (el.tagName === 'SCRIPT'
+                    ? API_ENDPOINT_RE.test(el.textContent || '')
+                    : CLICKABLE_RE.test((el.innerText || '').toLowerCase())) {
+                return true;
+            }
+        }
+        return false;
+    };
+
+    // Sonuç hesaplama ve detay
+    const result = {
+        foundAppointmentSystem: false,
+        foundBlsSystem: false,
+        foundSpainVisa: false,
+        appointmentStatus: 'unknown',
+        details: []
+    };
+
+    // BLS Spain spesifik kontroller
+    if (blsSpainChecks.hasBlsSpain) {
+        result.foundBlsSystem = true;
+        result.details.push('BLS Spain sistemi');
+    }
+
+    if (blsSpainChecks.hasSpainVisa || blsSpainChecks.hasSchengenVisa) {
+        result.foundSpainVisa = true;
+        result.details.push('İspanya/Schengen visa sayfası');
+    }
+
+    if (blsSpainChecks.hasTourismVisa) {
+        result.foundSpainVisa = true;
+        result.details.push('Turizm vizesi');
+    }
+
+    if (blsSpainChecks.hasAppointmentBooking) {
+        result.foundAppointmentSystem = true;
+        result.details.push('Randevu booking sistemi');
+    }
+
+    // Önce randevu yokluğunu kontrol et, sonra randevu mevcut ifadelerini
+    if (NO_APPOINTMENT_RE.test(bodyText)) {
+        result.appointmentStatus = 'not_available';
+        result.details.push('Randevu mevcut değil');
+    } else if (APPOINTMENT_AVAILABLE_RE.test(bodyText)) {
+        result.foundAppointmentSystem = true;
+        result.appointmentStatus = 'available';
+        result.details.push('Randevu mevcut');
+    } else if (BLS_APPOINTMENT_RE.test(bodyText)) {
+        result.foundAppointmentSystem = true;
+        result.appointmentStatus = 'system_available';
+        result.details.push('BLS randevu sistemi');
+    }
+
+    // Form veya sistem elementleri kontrolü: durum metinden belirlendiyse DOM hiç taranmaz
+    // (sonuç, durum ve detaylar değişmez)
+    if (result.appointmentStatus === 'unknown' && hasSystemElements()) {
+        result.foundAppointmentSystem = true;
+        result.appointmentStatus = 'system_available';
+        result.details.push('Randevu sistemi mevcut');
+    }
+
+    // Genel başarı durumu; Python tarafına sadece kullanılan alanlar, detaylar birleştirilmiş döner
+    return {
+        success: result.foundAppointmentSystem ||
+                 result.foundBlsSystem ||
+                 result.foundSpainVisa ||
+                 result.appointmentStatus !== 'unknown',
+        appointmentStatus: result.appointmentStatus,
+        details: result.details.join(' | ')
+    };
+};""".replace(
+    '__NO_APPOINTMENT_RE__', _js_regex(BROWSER_NO_APPOINTMENT_PHRASES)
+).replace(
+    '__APPOINTMENT_AVAILABLE_RE__', _js_regex(BROWSER_APPOINTMENT_AVAILABLE_PHRASES)
+).replace(
+    '__BLS_APPOINTMENT_RE__', _js_regex(BLS_APPOINTMENT_PHRASES)
+).replace(
+    '__SYSTEM_SELECTOR__', BROWSER_SYSTEM_SELECTOR.replace("'", "\\'")
+)
+
+# Randevu kontrolünde gereksiz kaynak türleri (bant genişliği); stylesheet innerText'i etkilediği için yüklenir
+_BLOCKED_RESOURCE_TYPES = frozenset(('image', 'media', 'font'))
+
+async def _block_heavy_resources(route):
+    """Playwright route handler: resim/medya/font isteklerini iptal et"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Browser sonuç mesajı ve randevu durumuna göre gösterilen işaret (diğer durumlar: 🔍)
+_BROWSER_MSG_TEMPLATE = "📍 {name} (Browser): {emoji} {details}"
+_BROWSER_STATUS_EMOJI = {'available': '✅', 'not_available': '❌'}
+_BROWSER_STATUSES = ('available', 'not_available', 'system_available', 'unknown')
+
+# Her context'te aynı olan ayarlar (header'lar ve proxy context bazında eklenir)
+_BROWSER_CONTEXT_OPTIONS = {
+    'user_agent': BrowserHeaders.USER_AGENTS[0],  # İlk user-agent'ı kullan
+    'locale': 'es-ES',  # İspanya lokali
+    'ignore_https_errors': True,
+}
+_ROUTE_ALL_REQUESTS = "**/*"
+
+# Her şehirde çağrılan ifade (kontrol fonksiyonu context init script'i olarak bir kez derlenir)
+_APPT_CHECK_CALL = "() => window.__checkAppt()"
+
+# Belirsiz durumda randevu sistemi göstergesi sayılan elementler (form, tarih input'u, select);
+# DOM kurmadan ham byte'lar üzerinde tek regex taraması ile aranır
+_FORM_RE = re.compile(rb'<form\b|<select\b|<input\b[^>]*\btype\s*=\s*["\']?date\b', re.IGNORECASE)
+
+def _extract_text(content: bytes) -> str:
+    """Sayfanın görünen metnini (küçük harf, HTML entity'leri çözülmüş) döndür"""
+    if HTMLParser is not None:
+        return HTMLParser(content).text().lower()
+
+    return BeautifulSoup(content, 'html.parser').get_text().lower()
+
+def _mask_proxy(proxy_url: str) -> str:
+    """Log'larda gösterilecek proxy (kimlik bilgisi içeriyorsa maskelenir)"""
+    return proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url
+
 class BLSSpainChecker:
     """İspanya vize randevu kontrol işlemlerini yönetir."""
 
     def __init__(self):
-        self.session = requests.Session()
         self.base_url = "https://blsspainvisa.com"
         
         # Gelişmiş anti-bot header sistemi
         self.headers = get_anti_bot_headers(self.base_url, 'es')
-        self.session.headers.update(self.headers)
+        # İstek header şablonu bir kez oluşturulur; her istekte sadece User-Agent döner
+        self._header_template = {**self.headers, **get_anti_bot_headers(self.base_url, 'es', referer=self.base_url)}
+        user_agents = BrowserHeaders.USER_AGENTS
+        offset = random.randrange(len(user_agents))
+        self._user_agent_cycle = itertools.cycle(user_agents[offset:] + user_agents[:offset])
+        self.session = self._create_session()
+        # Aynı proxy tekrar kullanıldığında CONNECT tüneli açık kalsın diye proxy başına session
+        self._proxy_sessions = {}  # proxy_url: requests.Session
         
+        # Hatalı proxy'leri blacklist'te tut (_load_proxies hatalı satırları buraya ekler)
+        self.blacklisted_proxies = set()
+        # Log'lar için maskelenmiş proxy gösterimleri (her seferinde yeniden oluşturulmaz)
+        self._masked_proxies = {}  # proxy_url: display
         # Proxy dosyasından proxy listesini yükle
         self.proxies = self._load_proxies()
-        # Hatalı proxy'leri blacklist'te tut
-        self.blacklisted_proxies = set()
-        # Başarısız proxy denemelerini takip et
-        self.failed_proxy_attempts = {}  # proxy_url: fail_count
-        self.max_proxy_failures = 1  # Maksimum başarısızlık sayısı (daha katı)
+        # Seçilebilir proxy'ler: liste + index (blacklist'e alma O(1) swap-pop)
+        self._available_proxies = [p for p in dict.fromkeys(self.proxies) if p not in self.blacklisted_proxies]
+        self._available_index = {p: i for i, p in enumerate(self._available_proxies)}
+        # Başarısız proxy denemelerini takip et (LRU, uzun çalışmalarda sınırsız büyümez)
+        self.failed_proxy_attempts = OrderedDict()  # proxy_url: fail_count
+        self._max_failed_entries = 4096
+        self.max_proxy_failures = 3  # Art arda bu kadar başarısızlıkta kalıcı blacklist
+        # Başarısız proxy, art arda hata sayısına göre üstel artan bir süre seçilmez (30s, 60s, ...)
+        self.proxy_cooldown_base = 30
+        # Ağırlıklı proxy seçimi için istatistikler (başarılı/başarısız istek, EWMA gecikme)
+        self._proxy_stats = {}  # proxy_url: {'success', 'fail', 'latency', 'cooldown_until'}
+        self.proxy_latency_scale = 5.0  # saniye; ağırlık exp(-latency / scale) ile azalır
+        self._last_proxy_url = None  # Aynı proxy art arda seçilmesin
         # Bağlantı timeout'u (saniye)
         self.proxy_timeout = 3  # 7'den 3'e düşürüldü (agresif)
+        # Ölü proxy'lerin toplu TCP kontrolü (ilk kontrolde ve periyodik)
+        self.proxy_probe_timeout = 2
+        self.proxy_prune_interval = 600  # 10 dakika
+        self._last_proxy_prune = None
+        # Host başına rate limit: pencere içinde en fazla rate_limit_burst istek
+        self.rate_limit_burst = 4
+        self.rate_limit_window = 24.0  # saniye (eski 4-8 sn bekleme ortalamasıyla aynı hız)
+        self._request_buckets = defaultdict(lambda: deque(maxlen=self.rate_limit_burst))
+        
+        # Browser fallback'inde aynı anda açık tutulacak en fazla sayfa (BLS host'unu yormamak için)
+        self.browser_concurrency = 4
+        # aiohttp yokken requests kontrollerinin paralel thread sayısı
+        self.http_max_workers = 8
+        # Proxy seçimi/istatistikleri ve rate limit durumu requests thread'leri arasında paylaşılır
+        self._proxy_lock = threading.RLock()
+        # Sayfa açıldıktan sonra randevu sistemi elementlerini bekleme süresi (ms)
+        self.browser_selector_timeout = 2000
+        # Chromium kontroller arasında açık tutulur; belirli kullanım/yaştan sonra yenilenir
+        self.browser_max_uses = 50  # context sayısı
+        self.browser_max_age = 300  # saniye
+        # Uzak browser servisi (Browserless vb.); tanımlıysa yerel Chromium yerine ona bağlanılır
+        self.browser_ws_endpoint = os.getenv('BLS_BROWSER_WS')
+        self._browser_loop = None  # Async Playwright nesneleri bu event loop'a bağlı
+        self._playwright = None
+        self._browser = None
+        self._browser_uses = 0
+        self._browser_started = 0.0
+        # Başarılı sayfa yüklemesinden sonraki cookie/localStorage, WAF challenge'ı tekrar çözülmesin diye
+        # sonraki context'lere verilir (WAF cookie'leri IP'ye bağlı olduğu için proxy başına)
+        self.storage_state_ttl = 1800  # saniye
+        self._storage_states = {}  # proxy_url (veya None): (expires_at, storage_state)
         
         # Türkiye BLS Spain Visa merkezleri
-        self.locations = {
-            'ankara': {
-                'url': 'https://turkey.blsspainvisa.com/ankara/english/',
-                'name': 'BLS İspanya Vize Merkezi Ankara'
-            },
-            'istanbul': {
-                'url': 'https://turkey.blsspainvisa.com/istanbul/english/',
-                'name': 'BLS İspanya Vize Merkezi İstanbul'
-            }
+        self.locations = LOCATIONS
+        # Browser sonuç mesajlarının şehir/durum başına sabit kısmı (sadece detaylar eklenir)
+        self._browser_msg_prefixes = {
+            (city, status): _BROWSER_MSG_TEMPLATE.format(
+                name=location_info['name'], emoji=_BROWSER_STATUS_EMOJI.get(status, '🔍'), details=''
+            )
+            for city, location_info in self.locations.items()
+            for status in _BROWSER_STATUSES
         }
     
+    def _create_session(self) -> requests.Session:
+        """Bağlantı havuzu ayarlanmış, SSL doğrulaması kapalı (BLS için) session oluştur"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=0))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.verify = False
+        session.headers.update(self.headers)
+        return session
+    
+    def _get_session(self, proxy: Optional[Dict]) -> requests.Session:
+        """Proxy'ye ait session'ı döndür (proxy yoksa ana session)"""
+        if not proxy:
+            return self.session
+        
+        proxy_url = proxy['http']
+        with self._proxy_lock:
+            session = self._proxy_sessions.get(proxy_url)
+            if session is None:
+                session = self._proxy_sessions[proxy_url] = self._create_session()
+            return session
+    
     def _normalize_proxy_url(self, proxy_line: str) -> Optional[str]:
         """
         Proxy URL'sini normalize eder ve validasyon yapar.
@@ -68,96 +482,82 @@ class BLSSpainChecker:
         Returns:
             str: Normalize edilmiş proxy URL'si veya None (hatalı ise)
         """
-        try:
-            proxy = proxy_line.strip()
-            
-            # Boş satır kontrolü
-            if not proxy:
-                return None
-            
-            # URL scheme'i kontrol et
-            if not proxy.startswith(('http://', 'https://')):
-                # Scheme yoksa http:// ekle
-                proxy = f"http://{proxy}"
-            
-            # URL'yi parse et ve validate et
-            try:
-                parsed = urlparse(proxy)
-                
-                # Hostname ve port kontrolü
-                if not parsed.hostname:
-                    logger.warning("Hatalı proxy hostname: %s", proxy_line[:50])
-                    return None
-                
-                if not parsed.port:
-                    logger.warning("Hatalı proxy port: %s", proxy_line[:50])
-                    return None
-                
-                # Port sayı kontrolü
-                if not (1 <= parsed.port <= 65535):
-                    logger.warning("Geçersiz port numarası: %s", proxy_line[:50])
-                    return None
-                
-                # IP adresi regex kontrolü (opsiyonel)
-                ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-                if re.match(ip_pattern, parsed.hostname):
-                    # IP adresi formatında ise her oktet 0-255 arası olmalı
-                    octets = parsed.hostname.split('.')
-                    for octet in octets:
-                        if not (0 <= int(octet) <= 255):
-                            logger.warning("Geçersiz IP adresi: %s", proxy_line[:50])
-                            return None
-                
-                # Normalize edilmiş URL'yi yeniden oluştur
-                if parsed.username and parsed.password:
-                    normalized_proxy = f"{parsed.scheme}://{parsed.username}:{parsed.password}@{parsed.hostname}:{parsed.port}"
-                else:
-                    normalized_proxy = f"{parsed.scheme}://{parsed.hostname}:{parsed.port}"
-                
-                return normalized_proxy
-                
-            except ValueError as e:
-                logger.warning("URL parse hatası: %s - %s", proxy_line[:50], str(e))
-                return None
-            
-        except Exception as e:
-            logger.warning("Proxy normalize hatası: %s - %s", proxy_line[:50], str(e))
+        proxy = proxy_line.strip()
+        
+        # Boş satır kontrolü
+        if not proxy:
+            return None
+        
+        # Tek regex ile scheme, kimlik bilgisi, host ve port ayrıştırılır
+        match = _PROXY_RE.match(proxy)
+        if not match:
+            logger.warning("Hatalı proxy formatı: %s", proxy_line[:50])
             return None
+        
+        normalized_proxy = self._build_proxy_url(match)
+        if not normalized_proxy:
+            logger.warning("Geçersiz port veya IP adresi: %s", proxy_line[:50])
+        return normalized_proxy
+    
+    @staticmethod
+    def _build_proxy_url(match: re.Match) -> Optional[str]:
+        """
+        _PROXY_LINE_RE eşleşmesinden normalize edilmiş proxy URL'si oluşturur.
+        
+        Returns:
+            str: Normalize edilmiş proxy URL'si veya None (port/IP geçersizse)
+        """
+        port = int(match['port'])
+        if not (1 <= port <= 65535):
+            return None
+        
+        host, scheme, username, password = match.group('host', 'scheme', 'username', 'password')
+        if isinstance(host, bytes):
+            # Byte eşleşmeleri (mmap) sadece port kontrolünden geçtikten sonra decode edilir
+            host, scheme, username, password = (
+                group.decode('utf-8', errors='replace') if group else group
+                for group in (host, scheme, username, password)
+            )
+        host = host.lower()
+        # IP adresi formatında ise her oktet 0-255 arası olmalı
+        if _IP_RE.match(host) and any(int(octet) > 255 for octet in host.split('.')):
+            return None
+        
+        scheme = scheme or 'http'
+        if username and password:
+            return f"{scheme}://{username}:{password}@{host}:{port}"
+        return f"{scheme}://{host}:{port}"
     
     def _load_proxies(self) -> List[str]:
         """
         proxy_list.txt dosyasından proxy listesini yükle ve normalize et
         """
         try:
-            with open(PROXY_LIST_FILE, 'r', encoding='utf-8') as f:
-                proxies = []
-                total_lines = 0
-                skipped_lines = 0
-                
-                for line_num, line in enumerate(f, 1):
-                    total_lines += 1
-                    line = line.strip()
-                    
-                    # Boş satırları ve comment satırlarını atla
-                    if not line or line.startswith('#'):
-                        skipped_lines += 1
-                        continue
-                    
-                    # Proxy'yi normalize et
-                    normalized_proxy = self._normalize_proxy_url(line)
-                    
-                    if normalized_proxy:
-                        proxies.append(normalized_proxy)
-                        logger.debug("Satır %d: Proxy eklendi: %s", line_num, 
-                                   normalized_proxy.split('@')[0] + '@***' if '@' in normalized_proxy else normalized_proxy)
-                    else:
-                        skipped_lines += 1
-                        logger.warning("Satır %d: Hatalı proxy atlandı: %s", line_num, line[:50])
-                        # Hatalı proxy'yi blacklist'e ekle
-                        self.blacklisted_proxies.add(line.strip())
+            with open(PROXY_LIST_FILE, 'rb') as f:
+                # Boş dosya mmap'lenemez
+                if os.fstat(f.fileno()).st_size == 0:
+                    logger.info("0/0 proxy başarıyla yüklendi (0 hatalı proxy atlandı)")
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # Dosya kopyalanmadan tek regex geçişinde taranır (boş ve comment satırları eşleşmez)
+                    proxies = []
+                    for match in _PROXY_LINE_BYTES_RE.finditer(data):
+                        normalized_proxy = None if match['invalid'] else self._build_proxy_url(match)
                         
+                        if normalized_proxy:
+                            proxies.append(normalized_proxy)
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Proxy eklendi: %s", self._display_proxy(normalized_proxy))
+                        else:
+                            line = match.group().strip().decode('utf-8', errors='replace')
+                            logger.warning("Hatalı proxy atlandı: %s", line[:50])
+                            # Hatalı proxy'yi blacklist'e ekle
+                            self.blacklisted_proxies.add(line)
+                    
+                    total_lines = len(_NEWLINE_BYTES_RE.findall(data)) + (data[-1:] != b'\n')
+            
             logger.info("%d/%d proxy başarıyla yüklendi (%d hatalı proxy atlandı)", 
-                       len(proxies), total_lines, skipped_lines)
+                       len(proxies), total_lines, total_lines - len(proxies))
             return proxies
             
         except FileNotFoundError:
@@ -167,6 +567,29 @@ class BLSSpainChecker:
             logger.error("Proxy dosyası okuma hatası: %s", str(e))
             return []
     
+    def _display_proxy(self, proxy_url: str) -> str:
+        """Proxy'nin log gösterimi (ilk kullanımda hesaplanıp saklanır)"""
+        display = self._masked_proxies.get(proxy_url)
+        if display is None:
+            display = self._masked_proxies[proxy_url] = _mask_proxy(proxy_url)
+        return display
+    
+    def _blacklist_proxy(self, proxy_url: str):
+        """Proxy'yi blacklist'e al ve seçilebilir proxy'lerden çıkar"""
+        with self._proxy_lock:
+            self.blacklisted_proxies.add(proxy_url)
+            self._proxy_stats.pop(proxy_url, None)
+            self._storage_states.pop(proxy_url, None)
+
+            index = self._available_index.pop(proxy_url, None)
+            if index is None:
+                return
+            # Son elemanı boşalan yere taşı
+            last = self._available_proxies.pop()
+            if index < len(self._available_proxies):
+                self._available_proxies[index] = last
+                self._available_index[last] = index
+    
     def _get_random_proxy(self) -> Optional[Dict]:
         """
         Requests için proxy dict formatında döndür
@@ -175,44 +598,50 @@ class BLSSpainChecker:
             return None
 
         # Blacklist'te olmayan proxy'ler arasından seç
-        available_proxies = [p for p in self.proxies if p not in self.blacklisted_proxies]
-        
-        if not available_proxies:
+        if not self._available_proxies:
             logger.warning("Tüm proxy'ler blacklist'te, proxy olmadan devam ediliyor")
             return None
 
-        proxy_url = random.choice(available_proxies)
-
-        try:
-            # Proxy URL'sinin geçerli olduğunu son kez kontrol et
-            parsed = urlparse(proxy_url)
-            if not (parsed.hostname and parsed.port):
-                logger.warning("_get_random_proxy: Geçersiz proxy URL")
-                self.blacklisted_proxies.add(proxy_url)
-                return None
-            
-            logger.info("Seçilen proxy: %s", proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url)
-            
-            return {
-                'http': proxy_url,
-                'https': proxy_url
-            }
-            
-        except Exception as e:
-            logger.warning("Proxy dict oluşturma hatası: %s", str(e))
-            self.blacklisted_proxies.add(proxy_url)
-            return None
+        # Liste sadece _build_proxy_url'den geçmiş (host ve port'u doğrulanmış) URL'ler içerir
+        proxy_url = self._get_random_proxy_url()
+        logger.info("Seçilen proxy: %s", self._display_proxy(proxy_url))
+        
+        return dict.fromkeys(('http', 'https'), proxy_url)
+    
+    def _request_headers(self) -> Dict[str, str]:
+        """Şablondan istek header'larını oluştur (User-Agent sırayla döner)"""
+        headers = self._header_template.copy()
+        headers['User-Agent'] = next(self._user_agent_cycle)
+        return headers
+    
+    def _reserve_request_slot(self, url: str) -> float:
+        """
+        URL'in host'u için token bucket'tan istek slotu ayır.
+        
+        Returns:
+            float: İstekten önce beklenmesi gereken süre (saniye)
+        """
+        with self._proxy_lock:
+            bucket = self._request_buckets[urlparse(url).hostname]
+            now = time.monotonic()
+            delay = 0.0
+            if len(bucket) == bucket.maxlen:
+                delay = max(0.0, self.rate_limit_window - (now - bucket[0]))
+            bucket.append(now + delay)
+            return delay
     
     def _make_request(self, url: str, method: str = 'GET', **kwargs) -> Optional[requests.Response]:
         """Proxy ile güvenli istek gönder - Gelişmiş anti-bot header'larla"""
         proxy = self._get_random_proxy()
         
         try:
-            # Her istek için yeni anti-bot header'lar al
-            dynamic_headers = get_anti_bot_headers(url, 'es', referer=self.base_url)
+            # Rate limiting: sadece aynı host'a pencere dolduysa bekle
+            delay = self._reserve_request_slot(url)
+            if delay:
+                time.sleep(delay)
             
-            # Mevcut header'ları güncelle
-            combined_headers = {**self.headers, **dynamic_headers}
+            # Her istek için header şablonu + dönen User-Agent
+            combined_headers = self._request_headers()
             if 'headers' in kwargs:
                 combined_headers.update(kwargs['headers'])
             kwargs['headers'] = combined_headers
@@ -221,24 +650,17 @@ class BLSSpainChecker:
             if 'timeout' not in kwargs:
                 kwargs['timeout'] = self.proxy_timeout
             
-            # SSL doğrulamasını BLS için kapat
-            kwargs['verify'] = False
-            
+            session = self._get_session(proxy)
+            started = time.monotonic()
             if method.upper() == 'GET':
-                response = self.session.get(url, proxies=proxy, **kwargs)
+                response = session.get(url, proxies=proxy, **kwargs)
             else:
-                response = self.session.post(url, proxies=proxy, **kwargs)
+                response = session.post(url, proxies=proxy, **kwargs)
 
-            # Başarılı istek - proxy'yi başarılı listesinden çıkar
+            # Başarılı istek - fail counter'ı sıfırla, gecikmeyi kaydet
             if proxy and 'http' in proxy:
-                proxy_url = proxy['http']
-                if proxy_url in self.failed_proxy_attempts:
-                    del self.failed_proxy_attempts[proxy_url]
-                    logger.debug("Proxy başarılı oldu, fail counter sıfırlandı: %s", 
-                               proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url)
+                self._record_proxy_success(proxy['http'], time.monotonic() - started)
             
-            # Rate limiting için bekle
-            time.sleep(random.uniform(4, 8))
             return response
             
         except requests.exceptions.ProxyError as e:
@@ -295,32 +717,77 @@ class BLSSpainChecker:
             error_type (str): Hata türü
         """
         try:
-            # Başarısızlık sayısını artır
-            self.failed_proxy_attempts[proxy_url] = self.failed_proxy_attempts.get(proxy_url, 0) + 1
-            fail_count = self.failed_proxy_attempts[proxy_url]
-            
-            display_proxy = proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url
-            logger.warning("Proxy başarısızlık kaydedildi: %s (Hata: %s, Sayı: %d/%d)", 
-                         display_proxy, error_type, fail_count, self.max_proxy_failures)
-            
-            # Maksimum başarısızlık sayısına ulaştıysa kalıcı blacklist'e ekle
-            if fail_count >= self.max_proxy_failures:
-                self.blacklisted_proxies.add(proxy_url)
-                logger.warning("BLACKLIST: Proxy artık kullanılmayacak: %s (Toplam %d başarısızlık - %s)", 
-                             display_proxy, fail_count, error_type)
-                
-                # Proxy listesinden de çıkar
-                if proxy_url in self.proxies:
-                    self.proxies.remove(proxy_url)
-                    logger.info("REMOVED: Proxy ana listeden çıkarıldı: %s", display_proxy)
-                
-                # Başarısızlık sayacını temizle
-                if proxy_url in self.failed_proxy_attempts:
-                    del self.failed_proxy_attempts[proxy_url]
+            with self._proxy_lock:
+                # Başarısızlık sayısını artır
+                fail_count = self.failed_proxy_attempts.pop(proxy_url, 0) + 1
+                self.failed_proxy_attempts[proxy_url] = fail_count
+                # En uzun süredir başarısız olmayan kayıtları at
+                while len(self.failed_proxy_attempts) > self._max_failed_entries:
+                    self.failed_proxy_attempts.popitem(last=False)
+
+                # Art arda hata sayısına göre üstel artan süre boyunca seçilmez
+                stats = self._proxy_stats_entry(proxy_url)
+                stats['fail'] += 1
+                stats['cooldown_until'] = time.monotonic() + self.proxy_cooldown_base * 2 ** (fail_count - 1)
+
+                display_proxy = self._display_proxy(proxy_url)
+                logger.warning("Proxy başarısızlık kaydedildi: %s (Hata: %s, Sayı: %d/%d)", 
+                             display_proxy, error_type, fail_count, self.max_proxy_failures)
+
+                # Maksimum başarısızlık sayısına ulaştıysa kalıcı blacklist'e ekle
+                if fail_count >= self.max_proxy_failures:
+                    self._blacklist_proxy(proxy_url)
+                    logger.warning("BLACKLIST: Proxy artık kullanılmayacak: %s (Toplam %d başarısızlık - %s)", 
+                                 display_proxy, fail_count, error_type)
+
+                    # Proxy listesinden de çıkar
+                    if proxy_url in self.proxies:
+                        self.proxies.remove(proxy_url)
+                        logger.info("REMOVED: Proxy ana listeden çıkarıldı: %s", display_proxy)
+
+                    # Başarısızlık sayacını temizle
+                    if proxy_url in self.failed_proxy_attempts:
+                        del self.failed_proxy_attempts[proxy_url]
+
+                    # Proxy'ye ait session'ı kapat
+                    session = self._proxy_sessions.pop(proxy_url, None)
+                    if session is not None:
+                        session.close()
             
         except Exception as e:
             logger.error("Proxy başarısızlık yönetim hatası: %s", str(e))
 
+    def _probe_proxy(self, proxy_url: str) -> bool:
+        """Proxy'ye TCP bağlantısı kurulabiliyor mu"""
+        try:
+            parsed = urlparse(proxy_url)
+            with socket.create_connection((parsed.hostname, parsed.port), timeout=self.proxy_probe_timeout):
+                return True
+        except (OSError, ValueError):
+            return False
+    
+    def _prune_dead_proxies(self):
+        """Tüm proxy'leri paralel TCP probe ile kontrol et, ölüleri başarısızlık olarak kaydet"""
+        self._last_proxy_prune = time.monotonic()
+        candidates = list(self._available_proxies)
+        if not candidates:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(64, len(candidates))) as executor:
+            results = list(executor.map(self._probe_proxy, candidates))
+        
+        dead = [proxy_url for proxy_url, alive in zip(candidates, results) if not alive]
+        if len(dead) == len(candidates):
+            # Hiçbiri cevap vermediyse sorun büyük ihtimalle yerel ağdadır; kimse cezalandırılmaz
+            logger.warning("Proxy ön kontrolü: hiçbir proxy erişilemedi, yerel ağ sorunu varsayılıyor")
+            return
+        
+        # Ölü proxy'ler cooldown/art arda hata yolundan geçer (kararsız proxy'ler geri dönebilir)
+        for proxy_url in dead:
+            self._handle_proxy_failure(proxy_url, "ProbeFailed")
+        
+        logger.info("Proxy ön kontrolü: %d/%d proxy erişilebilir", len(candidates) - len(dead), len(candidates))
+    
     def get_proxy_stats(self) -> Dict[str, int]:
         """
         Proxy istatistiklerini döndür (test/debug amaçlı)
@@ -332,7 +799,7 @@ class BLSSpainChecker:
             'total_proxies': len(self.proxies),
             'blacklisted_proxies': len(self.blacklisted_proxies),
             'failed_attempts': len(self.failed_proxy_attempts),
-            'available_proxies': len([p for p in self.proxies if p not in self.blacklisted_proxies])
+            'available_proxies': len(self._available_proxies)
         }
     
     def check_appointments(self) -> Optional[str]:
@@ -340,18 +807,30 @@ class BLSSpainChecker:
         try:
             available_appointments = []
 
-            for city, location_info in self.locations.items():
-                logger.info("%s kontrol ediliyor...", location_info['name'])
+            # Ölü proxy'leri gerçek isteklerden önce toplu ele
+            if self._last_proxy_prune is None or time.monotonic() - self._last_proxy_prune >= self.proxy_prune_interval:
+                self._prune_dead_proxies()
 
-                # Önce HTTP request kontrolü dene
-                http_appointments = self._check_with_requests(city, location_info)
-                if http_appointments:
-                    available_appointments.extend(http_appointments)
-                else:
-                    # HTTP başarısız olursa browser kontrolü yap
-                    browser_appointments = self._check_with_browser(city, location_info)
-                    if browser_appointments:
-                        available_appointments.extend(browser_appointments)
+            # HTTP kontrolleri: aiohttp varsa tüm şehirler eşzamanlı, yoksa sırayla
+            if aiohttp is not None:
+                http_results = asyncio.run(self._check_all_async())
+            else:
+                http_results = {}
+
+            # aiohttp yoksa requests ile; şehirler thread pool'da paralel kontrol edilir
+            pending = [city for city in self.locations if city not in http_results]
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(self.http_max_workers, len(pending))) as executor:
+                    http_results.update(zip(pending, executor.map(
+                        lambda city: self._check_with_requests(city, self.locations[city]), pending
+                    )))
+
+            # HTTP ile sonucu belirsiz kalan şehirler tek browser üzerinde eşzamanlı kontrol edilir
+            browser_cities = [city for city, appointments in http_results.items() if appointments is None]
+            browser_results = self._run_browser_checks(browser_cities) if browser_cities else {}
+
+            for city in self.locations:
+                available_appointments.extend(http_results[city] or browser_results.get(city, []))
 
             if available_appointments:
                 return "\n".join(available_appointments)
@@ -362,340 +841,380 @@ class BLSSpainChecker:
             logger.error("İspanya vize kontrolünde hata: %s", str(e))
             raise
 
-    def _check_with_requests(self, city: str, location_info: Dict) -> List[str]:
-        """HTTP requests ile kontrol (mevcut sistem)"""
+    async def _check_all_async(self) -> Dict[str, Optional[List[str]]]:
+        """Tüm şehirleri tek aiohttp session'ında eşzamanlı kontrol et"""
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = await asyncio.gather(*(
+                self._check_with_aiohttp(session, city, location_info)
+                for city, location_info in self.locations.items()
+            ))
+        return dict(zip(self.locations, results))
+
+    async def _check_with_aiohttp(self, session, city: str, location_info: Dict) -> Optional[List[str]]:
+        """_check_with_requests'in aiohttp versiyonu (proxy hata yönetimi aynı)"""
+        logger.info("%s kontrol ediliyor...", location_info['name'])
+        proxy = self._get_random_proxy()
+        proxy_url = proxy['http'] if proxy else None
+        url = location_info['url']
+
+        try:
+            # Rate limiting: sadece aynı host'a pencere dolduysa bekle (diğer şehirleri bloklamaz)
+            delay = self._reserve_request_slot(url)
+            if delay:
+                await asyncio.sleep(delay)
+
+            headers = self._request_headers()
+            timeout = aiohttp.ClientTimeout(total=self.proxy_timeout)
+
+            started = time.monotonic()
+            async with session.get(url, proxy=proxy_url, ssl=False, headers=headers, timeout=timeout) as response:
+                latency = time.monotonic() - started
+                status = response.status
+                scanner = _PhraseStreamScanner()
+                if status == 200:
+                    async for chunk in response.content.iter_chunked(RESPONSE_CHUNK_SIZE):
+                        if scanner.feed(chunk):
+                            break
+
+            # Başarılı istek - fail counter'ı sıfırla, gecikmeyi kaydet
+            if proxy_url:
+                self._record_proxy_success(proxy_url, latency)
+
+        except aiohttp.ClientProxyConnectionError as e:
+            logger.error("Proxy hatası: %s", str(e))
+            error_type = "ProxyError"
+        except aiohttp.ClientSSLError as e:
+            logger.error("SSL protokol hatası: %s", str(e))
+            error_type = "SSLError"
+        except aiohttp.ClientConnectorError as e:
+            logger.error("Bağlantı hatası: %s", str(e))
+            error_type = "ConnectionError"
+        except asyncio.TimeoutError:
+            logger.error("Proxy timeout hatası (%ds)", self.proxy_timeout)
+            error_type = "Timeout"
+        except aiohttp.ClientError as e:
+            logger.error("HTTP istek hatası: %s", str(e))
+            error_type = "RequestException"
+        except Exception as e:
+            logger.error("HTTP requests hatası (%s): %s", city, str(e))
+            error_type = "Unknown"
+        else:
+            if status != 200:
+                logger.warning("HTTP isteği başarısız: %s", city)
+                return None
+            return self._parse_appointments(city, location_info, scanner.content, scanner.categories)
+
+        if proxy_url:
+            self._handle_proxy_failure(proxy_url, error_type)
+        logger.warning("HTTP isteği başarısız: %s", city)
+        return None
+
+    def _check_with_requests(self, city: str, location_info: Dict) -> Optional[List[str]]:
+        """HTTP requests ile kontrol (mevcut sistem); sonuç belirsizse None"""
+        logger.info("%s kontrol ediliyor...", location_info['name'])
         try:
-            response = self._make_request(location_info['url'])
+            response = self._make_request(location_info['url'], stream=True)
             if not response or response.status_code != 200:
+                if response:
+                    response.close()
                 logger.warning("HTTP isteği başarısız: %s", city)
-                return []
+                return None
+
+            # Yanıtı parça parça tara, kesin sonuçta okumayı bırak
+            scanner = _PhraseStreamScanner()
+            try:
+                for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+                    if scanner.feed(chunk):
+                        break
+            finally:
+                response.close()
+
+            return self._parse_appointments(city, location_info, scanner.content, scanner.categories)
 
-            # HTML içeriğini parse et
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except Exception as e:
+            logger.error("HTTP requests hatası (%s): %s", city, str(e))
+            return None
 
-            # Sayfa metnini kontrol et
-            page_text = soup.get_text().lower()
+    def _parse_appointments(self, city: str, location_info: Dict, content: bytes,
+                            categories: Optional[set] = None) -> Optional[List[str]]:
+        """HTTP yanıtındaki sayfa içeriğinden randevu durumunu çıkar
+        
+        categories verilmişse (yanıt okunurken taranmış) ham içerik tekrar taranmaz.
+        Sayfa kesin olarak randevu olmadığını söylüyorsa boş liste, sonuç belirsizse
+        None döner (sadece belirsiz şehirler browser ile kontrol edilir).
+        """
+        try:
+            # Randevu var/yok ifadelerini önce parse etmeden ham içerikte tara
+            if categories is None:
+                categories = _scan_phrases(content.decode('utf-8', errors='ignore').lower())
             
-            # Randevu yokluğu ifadeleri
-            no_appointment_phrases = [
-                'no appointments available',
-                'randevu yok',
-                'hiç randevu yok',
-                'müsait randevu yok',
-                'appointment not available',
-                'no slots available',
-                'fully booked',
-                'no available dates'
-            ]
-
-            # Randevu var ifadeleri
-            appointment_available_phrases = [
-                'book appointment',
-                'randevu al',
-                'appointment available',
-                'available dates',
-                'select date',
-                'tarih seçin'
-            ]
+            if not categories:
+                # Belirsiz durum - HTML'i parse et (entity'li metin için)
+                categories = _scan_phrases(_extract_text(content))
 
             appointments = []
             
-            # Önce randevu var mı kontrol et
-            has_appointment_available = any(phrase in page_text for phrase in appointment_available_phrases)
-            has_no_appointment = any(phrase in page_text for phrase in no_appointment_phrases)
+            has_appointment_available = 'yes' in categories
+            has_no_appointment = 'no' in categories
 
             if has_appointment_available and not has_no_appointment:
                 appointments.append(f"📍 {location_info['name']} (HTTP): Randevu mevcut olabilir")
             elif not has_no_appointment:
                 # Belirsiz durum - form elementleri var mı kontrol et
-                if soup.find('form') or soup.find('input', {'type': 'date'}) or soup.find('select'):
+                if _FORM_RE.search(content) is not None:
                     appointments.append(f"📍 {location_info['name']} (HTTP): Randevu sistemi mevcut")
 
             if appointments:
                 logger.info("HTTP ile randevu bulundu: %s", city)
+                return appointments
 
-            return appointments
+            return [] if has_no_appointment else None
 
         except Exception as e:
-            logger.error("HTTP requests hatası (%s): %s", city, str(e))
-            return []
+            logger.error("HTML parse hatası (%s): %s", city, str(e))
+            return None
+
+    def _run_browser_checks(self, cities: List[str]) -> Dict[str, List[str]]:
+        """Browser kontrollerini kalıcı event loop'ta çalıştır (browser döngüler arasında açık kalır)"""
+        if self._browser_loop is None:
+            self._browser_loop = asyncio.new_event_loop()
+            atexit.register(self.close)
+        return self._browser_loop.run_until_complete(self._check_all_browser_async(cities))
 
-    def _check_with_browser(self, city: str, location_info: Dict) -> List[str]:
-        """Playwright ile JavaScript kontrolü"""
+    async def _check_all_browser_async(self, cities: List[str]) -> Dict[str, List[str]]:
+        """Verilen şehirleri tek Chromium üzerinde eşzamanlı kontrol et (Playwright async API)"""
         try:
-            from playwright.sync_api import sync_playwright
-            
-            with sync_playwright() as p:
-                # Proxy ayarları
-                proxy_url = self._get_random_proxy_url()
-                proxy_config = None
-                if proxy_url:
-                    proxy_config = {"server": proxy_url}
-                    logger.info("Browser proxy: %s", proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url)
-
-                # Browser başlat
-                browser = p.chromium.launch(
+            browser = await self._acquire_browser()
+        except Exception as e:
+            logger.error("Browser başlatma hatası: %s", str(e))
+            await self._close_browser()
+            return {}
+
+        self._browser_uses += len(cities)
+        semaphore = asyncio.Semaphore(self.browser_concurrency)
+        results = await asyncio.gather(*(
+            self._check_with_browser(browser, semaphore, city, self.locations[city])
+            for city in cities
+        ))
+        return dict(zip(cities, results))
+
+    async def _acquire_browser(self):
+        """Açık browser'ı döndür; yoksa, bağlantısı koptuysa veya kullanım/yaş sınırını aştıysa yeniden başlat"""
+        if self._browser is not None and (
+            not self._browser.is_connected() or
+            self._browser_uses >= self.browser_max_uses or
+            time.monotonic() - self._browser_started >= self.browser_max_age
+        ):
+            # Playwright driver'ı açık kalır, sadece Chromium yenilenir
+            await self._close_browser(stop_playwright=False)
+
+        if self._browser is None:
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+            self._browser = await self._connect_remote_browser() if self.browser_ws_endpoint else None
+            if self._browser is None:
+                self._browser = await self._playwright.chromium.launch(
                     headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage'],
-                    proxy=proxy_config
+                    args=['--no-sandbox', '--disable-dev-shm-usage']
                 )
+            self._browser_uses = 0
+            self._browser_started = time.monotonic()
+        return self._browser
 
-                # Context oluştur
-                context = browser.new_context(
-                    user_agent=BrowserHeaders.USER_AGENTS[0],  # İlk user-agent'ı kullan
-                    locale='es-ES',  # İspanya lokali
-                    ignore_https_errors=True,
-                    extra_http_headers=BrowserHeaders.get_playwright_headers(location_info['url'], 'es')
-                )
+    async def _connect_remote_browser(self):
+        """BLS_BROWSER_WS endpoint'ine bağlan (CDP adresiyse connect_over_cdp); başarısızsa None"""
+        endpoint = self.browser_ws_endpoint
+        try:
+            if endpoint.startswith(('http://', 'https://')) or '/devtools/' in endpoint:
+                browser = await self._playwright.chromium.connect_over_cdp(endpoint, timeout=30000)
+            else:
+                browser = await self._playwright.chromium.connect(endpoint, timeout=30000)
+            logger.info("Uzak browser'a bağlanıldı: %s", urlparse(endpoint).netloc or endpoint)
+            return browser
+        except Exception as e:
+            logger.warning("Uzak browser bağlantı hatası, yerel Chromium kullanılacak: %s", str(e))
+            return None
 
-                page = context.new_page()
-                page.set_default_timeout(30000)
+    async def _close_browser(self, stop_playwright: bool = True):
+        """Browser'ı (ve istenirse Playwright'ı) kapat; hatalar loglanıp yutulur"""
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug("Browser kapatma hatası: %s", str(e))
+            self._browser = None
 
-                # BLS Spain Visa sayfasına git
-                logger.info("BLS Spain Visa sayfası yükleniyor: %s", location_info['url'])
-                response = page.goto(location_info['url'], wait_until='networkidle')
+        if stop_playwright and self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug("Playwright durdurma hatası: %s", str(e))
+            self._playwright = None
 
-                if not response or response.status != 200:
-                    logger.error("Sayfa yüklenemedi (%s): %d", city, response.status if response else 0)
-                    browser.close()
-                    return []
+    def close(self):
+        """Kalıcı browser'ı ve event loop'unu kapat (program kapanırken otomatik çağrılır)"""
+        if self._browser_loop is None:
+            return
+        try:
+            self._browser_loop.run_until_complete(self._close_browser())
+        finally:
+            self._browser_loop.close()
+            self._browser_loop = None
+            atexit.unregister(self.close)
 
-                # Sayfa yüklenmesini bekle
-                time.sleep(random.uniform(3, 6))
+    async def _check_with_browser(self, browser, semaphore: asyncio.Semaphore,
+                                  city: str, location_info: Dict) -> List[str]:
+        """Playwright ile JavaScript kontrolü (browser şehirler arasında paylaşılır)"""
+        async with semaphore:
+            try:
+                from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-                # JavaScript ile randevu kontrolü - gelişmiş kontroller
-                try:
-                    appointment_check = page.evaluate("""() => {
-                        const bodyText = document.body.innerText.toLowerCase();
-                        const titleText = document.title.toLowerCase();
-                        
-                        // BLS Spain spesifik kontroller
-                        const blsSpainChecks = {
-                            hasBlsSpain: bodyText.includes('bls spain') || titleText.includes('bls spain'),
-                            hasSpainVisa: bodyText.includes('spain visa') || bodyText.includes('visado españa'),
-                            hasSchengenVisa: bodyText.includes('schengen visa') || bodyText.includes('schengen'),
-                            hasTourismVisa: bodyText.includes('tourism visa') || bodyText.includes('turismo'),
-                            hasAppointmentBooking: bodyText.includes('appointment booking') || bodyText.includes('cita previa')
-                        };
-                        
-                        // Randevu yokluğu ifadeleri (İngilizce/Türkçe/İspanyolca)
-                        const noAppointmentPhrases = [
-                            'no appointments available',
-                            'appointment not available',
-                            'randevu yok',
-                            'hiç randevu yok',
-                            'müsait randevu yok',
-                            'no slots available',
-                            'fully booked',
-                            'no available dates',
-                            'sin citas disponibles',
-                            'keine termine verfügbar',
-                            'pas de rendez-vous disponible',
-                            'todos los horarios están ocupados',
-                            'no hay fechas disponibles'
-                        ];
-                        
-                        // Randevu mevcut ifadeleri
-                        const appointmentAvailable = [
-                            'book appointment',
-                            'randevu al',
-                            'appointment available',
-                            'available dates',
-                            'select date',
-                            'tarih seçin',
-                            'choose date',
-                            'pick a date',
-                            'schedule appointment',
-                            'reservar cita',
-                            'seleccionar fecha',
-                            'cita disponible',
-                            'fechas disponibles'
-                        ];
-                        
-                        // BLS spesifik randevu ifadeleri
-                        const blsAppointmentPhrases = [
-                            'bls appointment',
-                            'visa appointment',
-                            'application appointment',
-                            'biometric appointment',
-                            'document submission',
-                            'passport collection',
-                            'vac appointment'
-                        ];
-                        
-                        // Form elementleri kontrolü - gelişmiş
-                        const hasForm = document.querySelector('form') !== null ||
-                                       document.querySelector('input[type="date"]') !== null ||
-                                       document.querySelector('select') !== null ||
-                                       document.querySelector('.calendar') !== null ||
-                                       document.querySelector('[class*="calendar"]') !== null ||
-                                       document.querySelector('[class*="appointment"]') !== null ||
-                                       document.querySelector('button[class*="book"]') !== null ||
-                                       document.querySelector('[name*="date"]') !== null ||
-                                       document.querySelector('[id*="appointment"]') !== null;
-                        
-                        // BLS spesifik elementler
-                        const hasBlsElements = document.querySelector('[class*="bls"]') !== null ||
-                                             document.querySelector('[id*="bls"]') !== null ||
-                                             document.querySelector('.appointment-form') !== null ||
-                                             document.querySelector('.booking-calendar') !== null ||
-                                             document.querySelector('[class*="spain"]') !== null ||
-                                             document.querySelector('[class*="visa"]') !== null;
-                        
-                        // Gelişmiş JavaScript ile clickable element arama
-                        const hasClickableAppointmentElements = [...document.querySelectorAll('div, span, a, button')].some(e => {
-                            const text = (e.innerText || '').toLowerCase();
-                            return text.includes('book appointment') || 
-                                   text.includes('schedule appointment') ||
-                                   text.includes('reserve appointment') ||
-                                   text.includes('cita previa') ||
-                                   text.includes('reservar cita');
-                        });
-                        
-                        // API endpoint kontrolü
-                        const hasApiEndpoints = [...document.querySelectorAll('script')].some(script => {
-                            const scriptText = script.textContent || '';
-                            return scriptText.includes('/api/appointment') ||
-                                   scriptText.includes('/booking/') ||
-                                   scriptText.includes('appointment-api') ||
-                                   scriptText.includes('bls-api') ||
-                                   scriptText.includes('/calendar/');
-                        });
-                        
-                        // Date picker elementleri
-                        const hasDatePicker = document.querySelector('input[type="date"]') !== null ||
-                                            document.querySelector('.datepicker') !== null ||
-                                            document.querySelector('[class*="date"]') !== null ||
-                                            document.querySelector('.ui-datepicker') !== null ||
-                                            document.querySelector('[data-date]') !== null;
-                        
-                        // Sonuç hesaplama ve detay
-                        const result = {
-                            foundAppointmentSystem: false,
-                            foundBlsSystem: false,
-                            foundSpainVisa: false,
-                            appointmentStatus: 'unknown',
-                            details: []
-                        };
-                        
-                        // BLS Spain spesifik kontroller
-                        if (blsSpainChecks.hasBlsSpain) {
-                            result.foundBlsSystem = true;
-                            result.details.push('BLS Spain sistemi');
-                        }
-                        
-                        if (blsSpainChecks.hasSpainVisa || blsSpainChecks.hasSchengenVisa) {
-                            result.foundSpainVisa = true;
-                            result.details.push('İspanya/Schengen visa sayfası');
-                        }
-                        
-                        if (blsSpainChecks.hasTourismVisa) {
-                            result.foundSpainVisa = true;
-                            result.details.push('Turizm vizesi');
-                        }
-                        
-                        if (blsSpainChecks.hasAppointmentBooking) {
-                            result.foundAppointmentSystem = true;
-                            result.details.push('Randevu booking sistemi');
-                        }
-                        
-                        // Önce randevu yokluğunu kontrol et
-                        let hasNoAppointment = false;
-                        for (const phrase of noAppointmentPhrases) {
-                            if (bodyText.includes(phrase)) {
-                                hasNoAppointment = true;
-                                result.appointmentStatus = 'not_available';
-                                result.details.push('Randevu mevcut değil');
-                                break;
-                            }
-                        }
-                        
-                        // Randevu mevcut kontrolü (sadece "randevu yok" yoksa)
-                        if (!hasNoAppointment) {
-                            let hasAppointmentAvailable = false;
-                            
-                            // Genel randevu ifadeleri
-                            for (const phrase of appointmentAvailable) {
-                                if (bodyText.includes(phrase)) {
-                                    hasAppointmentAvailable = true;
-                                    result.appointmentStatus = 'available';
-                                    result.details.push('Randevu mevcut');
-                                    break;
-                                }
-                            }
-                            
-                            // BLS spesifik randevu ifadeleri
-                            if (!hasAppointmentAvailable) {
-                                for (const phrase of blsAppointmentPhrases) {
-                                    if (bodyText.includes(phrase)) {
-                                        hasAppointmentAvailable = true;
-                                        result.appointmentStatus = 'system_available';
-                                        result.details.push('BLS randevu sistemi');
-                                        break;
-                                    }
-                                }
-                            }
-                            
-                            if (hasAppointmentAvailable) {
-                                result.foundAppointmentSystem = true;
-                            }
-                        }
-                        
-                        // Form veya sistem elementleri kontrolü
-                        if (hasForm || hasBlsElements || hasClickableAppointmentElements || hasApiEndpoints || hasDatePicker) {
-                            result.foundAppointmentSystem = true;
-                            if (result.appointmentStatus === 'unknown') {
-                                result.appointmentStatus = 'system_available';
-                                result.details.push('Randevu sistemi mevcut');
-                            }
-                        }
-                        
-                        // Genel başarı durumu
-                        result.success = result.foundAppointmentSystem || 
-                                       result.foundBlsSystem || 
-                                       result.foundSpainVisa ||
-                                       result.appointmentStatus !== 'unknown';
-                        
-                        return result;
-                    }""")
+                async with self._open_context(browser, location_info) as (context, proxy_url):
+                    page = await context.new_page()
+                    page.set_default_timeout(30000)
 
-                    logger.info("JavaScript kontrolü (%s): %s", city, {
-                        'success': appointment_check.get('success', False),
-                        'status': appointment_check.get('appointmentStatus', 'unknown'),
-                        'details': appointment_check.get('details', [])
-                    })
+                    # BLS Spain Visa sayfasına git
+                    logger.info("BLS Spain Visa sayfası yükleniyor: %s", location_info['url'])
+                    response = await page.goto(location_info['url'], wait_until='domcontentloaded')
 
-                    browser.close()
+                    if not response or response.status != 200:
+                        logger.error("Sayfa yüklenemedi (%s): %d", city, response.status if response else 0)
+                        return []
 
-                    if appointment_check.get('success', False):
-                        details = " | ".join(appointment_check.get('details', ['Sistem mevcut']))
-                        status = appointment_check.get('appointmentStatus', 'unknown')
-                        
-                        if status == 'available':
-                            return [f"📍 {location_info['name']} (Browser): ✅ {details}"]
-                        elif status == 'not_available':
-                            return [f"📍 {location_info['name']} (Browser): ❌ {details}"]
-                        else:
-                            return [f"📍 {location_info['name']} (Browser): 🔍 {details}"]
-                    else:
+                    # Challenge/cookie durumunu bu proxy'nin sonraki context'leri için sakla
+                    self._storage_states[proxy_url] = (
+                        time.monotonic() + self.storage_state_ttl, await context.storage_state()
+                    )
+
+                    # Sabit bekleme yerine randevu sistemi elementlerinden biri DOM'a eklenene kadar bekle;
+                    # süre dolarsa sayfa metni yine de kontrol edilir (metin tabanlı sonuçlar kaçmasın)
+                    try:
+                        await page.wait_for_selector(BROWSER_SYSTEM_SELECTOR, state='attached',
+                                                     timeout=self.browser_selector_timeout)
+                    except PlaywrightTimeoutError:
+                        logger.debug("Randevu sistemi elementi bulunamadı (%s), sayfa metni kontrol ediliyor", city)
+
+                    # JavaScript ile randevu kontrolü - gelişmiş kontroller
+                    try:
+                        appointment_check = await page.evaluate(_APPT_CHECK_CALL)
+
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info("JavaScript kontrolü (%s): success=%s status=%s details=%s", city,
+                                        appointment_check.get('success', False),
+                                        appointment_check.get('appointmentStatus', 'unknown'),
+                                        appointment_check.get('details', ''))
+
+                        if appointment_check.get('success', False):
+                            status = appointment_check.get('appointmentStatus', 'unknown')
+                            prefix = self._browser_msg_prefixes.get((city, status)) or _BROWSER_MSG_TEMPLATE.format(
+                                name=location_info['name'], emoji=_BROWSER_STATUS_EMOJI.get(status, '🔍'), details=''
+                            )
+                            return [prefix + (appointment_check.get('details') or 'Sistem mevcut')]
                         return []
 
-                except Exception as js_error:
-                    logger.warning("JavaScript evaluation hatası (%s): %s", city, str(js_error))
-                    browser.close()
-                    return []
+                    except Exception as js_error:
+                        logger.warning("JavaScript evaluation hatası (%s): %s", city, str(js_error))
+                        return []
 
-        except Exception as e:
-            logger.error("Browser kontrolü hatası (%s): %s", city, str(e))
-            return []
+            except Exception as e:
+                logger.error("Browser kontrolü hatası (%s): %s", city, str(e))
+                return []
+
+    @asynccontextmanager
+    async def _open_context(self, browser, location_info: Dict):
+        """Şehir için proxy'li context aç ve (context, proxy_url) döndür; çıkışta sadece context
+        kapanır (browser açık kalır)"""
+        # Proxy ayarları (browser paylaşılır, proxy context bazında verilir)
+        proxy_url = self._get_random_proxy_url()
+        proxy_config = None
+        if proxy_url:
+            proxy_config = {"server": proxy_url}
+            logger.info("Browser proxy: %s", self._display_proxy(proxy_url))
+
+        # Bu proxy ile daha önce kaydedilmiş (süresi dolmamış) storage state varsa kullan
+        storage_state = None
+        saved = self._storage_states.get(proxy_url)
+        if saved is not None:
+            if saved[0] > time.monotonic():
+                storage_state = saved[1]
+            else:
+                del self._storage_states[proxy_url]
+
+        context = await browser.new_context(
+            **_BROWSER_CONTEXT_OPTIONS,
+            extra_http_headers=BrowserHeaders.get_playwright_headers(location_info['url'], 'es'),
+            proxy=proxy_config,
+            storage_state=storage_state
+        )
+        try:
+            await context.add_init_script(_APPT_CHECK_JS)
+            await context.route(_ROUTE_ALL_REQUESTS, _block_heavy_resources)
+            yield context, proxy_url
+        finally:
+            await context.close()
 
     def _get_random_proxy_url(self) -> Optional[str]:
-        """Random proxy URL döndür"""
-        if not self.proxies:
-            return None
+        """Proxy URL döndür (başarı oranı yüksek ve hızlı proxy'ler daha sık seçilir,
+        birden fazla seçenek varsa bir önceki proxy art arda seçilmez)"""
+        with self._proxy_lock:
+            proxies = self._available_proxies
+            if not proxies:
+                return None
+            last_index = self._available_index.get(self._last_proxy_url) if len(proxies) > 1 else None
 
-        available_proxies = [p for p in self.proxies if p not in self.blacklisted_proxies]
-        if not available_proxies:
-            return None
+            if not self._proxy_stats:
+                # Henüz istatistik yoksa tüm ağırlıklar eşit; önceki proxy'nin index'i atlanır (O(1))
+                if last_index is None:
+                    proxy_url = random.choice(proxies)
+                else:
+                    index = random.randrange(len(proxies) - 1)
+                    proxy_url = proxies[index + (index >= last_index)]
+            else:
+                proxy_url = self._choose_weighted_proxy(None if last_index is None else self._last_proxy_url)
+
+            self._last_proxy_url = proxy_url
+            return proxy_url
+
+    def _choose_weighted_proxy(self, exclude: Optional[str]) -> str:
+        """Seçilebilir proxy'ler arasından istatistik ağırlıklı seçim yap (exclude hariç)"""
+        now = time.monotonic()
+        pool, weights = [], []
+        for proxy_url in self._available_proxies:
+            if proxy_url == exclude:
+                continue
+            stats = self._proxy_stats.get(proxy_url)
+            if stats is None:
+                weight = 0.5  # Denenmemiş proxy: (0+1)/(0+0+2)
+            elif stats['cooldown_until'] > now:
+                continue
+            else:
+                weight = ((stats['success'] + 1) / (stats['success'] + stats['fail'] + 2) *
+                          math.exp(-stats['latency'] / self.proxy_latency_scale))
+            pool.append(proxy_url)
+            weights.append(weight)
+
+        # Hepsi bekleme süresindeyse eşit olasılıkla seç
+        if not pool:
+            return random.choice(self._available_proxies)
+        return random.choices(pool, weights=weights)[0]
+
+    def _proxy_stats_entry(self, proxy_url: str) -> Dict:
+        """Proxy'nin istatistik kaydını döndür (yoksa oluştur)"""
+        stats = self._proxy_stats.get(proxy_url)
+        if stats is None:
+            stats = self._proxy_stats[proxy_url] = {'success': 0, 'fail': 0, 'latency': 0.0, 'cooldown_until': 0.0}
+        return stats
+
+    def _record_proxy_success(self, proxy_url: str, latency: float):
+        """Başarılı isteği kaydet: fail counter sıfırlanır, gecikme EWMA ile güncellenir"""
+        with self._proxy_lock:
+            stats = self._proxy_stats_entry(proxy_url)
+            stats['latency'] = latency if not stats['success'] else 0.3 * latency + 0.7 * stats['latency']
+            stats['success'] += 1
+            stats['cooldown_until'] = 0.0
 
-        return random.choice(available_proxies) 
\ No newline at end of file
+            if self.failed_proxy_attempts.pop(proxy_url, None) is not None and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Proxy başarılı oldu, fail counter sıfırlandı: %s", self._display_proxy(proxy_url)) 
\ No newline at end of file
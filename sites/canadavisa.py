@@ -6,45 +6,201 @@ Kanada vize randevularını IRCC sistemi üzerinden kontrol eder.
 """
 
 import requests
+import asyncio
+import ipaddress
 import json
 import logging
 import time
 import random
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# selectolax opsiyonel: varsa HTML C parser ile parse edilir, yoksa BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# aiohttp opsiyonel: varsa lokasyonlar eşzamanlı kontrol edilir
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 # Path helper import et
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.paths import PROXY_LIST_FILE
-from config.browser_headers import BrowserHeaders, get_anti_bot_headers
+from config.browser_headers import (
+    ACCEPT_HEADERS, CACHE_CONTROL_OPTIONS, USER_AGENTS, BrowserHeaders, get_anti_bot_headers
+)
 
 logger = logging.getLogger(__name__)
 
+# Bu sayıdan fazla proxy satırı varsa (ve birden fazla çekirdek varsa) normalize işlemi process pool'da yapılır
+_PARALLEL_NORMALIZE_MIN_LINES = 5000
+_NORMALIZE_CHUNK_SIZE = 512
+
+# Randevu link'leri (href) ve IRCC portal referansları (metin)
+_APPT_RE = re.compile(r'appointment|booking|schedule', re.I)
+_IRCC_RE = re.compile(r'ircc|immigration.*canada', re.I)
+
+# Randevu sistemi ifadeleri (HTTP kontrolü)
+APPOINTMENT_SYSTEM_PHRASES = (
+    'book an appointment',
+    'schedule appointment',
+    'make an appointment',
+    'appointment booking',
+    'visa application centre',
+    'biometric appointment',
+    'randevu al',
+    'randevu oluştur',
+)
+
+# Aho-Corasick automaton (opsiyonel, pyahocorasick kuruluysa tüm ifadeler tek geçişte aranır)
+try:
+    import ahocorasick
+
+    _APPT_PHRASE_AUTOMATON = ahocorasick.Automaton()
+    for _phrase in APPOINTMENT_SYSTEM_PHRASES:
+        _APPT_PHRASE_AUTOMATON.add_word(_phrase, _phrase)
+    _APPT_PHRASE_AUTOMATON.make_automaton()
+except ImportError:
+    _APPT_PHRASE_AUTOMATON = None
+
+
+def _has_appointment_phrase(page_text: str) -> bool:
+    """Küçük harfli sayfa metninde randevu sistemi ifadesi var mı (ilk eşleşmede durur)"""
+    if _APPT_PHRASE_AUTOMATON is not None:
+        return next(_APPT_PHRASE_AUTOMATON.iter(page_text), None) is not None
+
+    return any(phrase in page_text for phrase in APPOINTMENT_SYSTEM_PHRASES)
+
+def _normalize_proxy_url(proxy_line: str) -> Optional[str]:
+    """
+    Proxy URL'sini normalize eder ve validasyon yapar.
+    (Process pool'a verilebilmesi için modül seviyesinde, state'siz)
+    
+    Args:
+        proxy_line (str): Ham proxy satırı
+        
+    Returns:
+        str: Normalize edilmiş proxy URL'si veya None (hatalı ise)
+    """
+    try:
+        proxy = proxy_line.strip()
+        
+        # Boş satır kontrolü
+        if not proxy:
+            return None
+        
+        # URL scheme'i kontrol et
+        if not proxy.startswith(('http://', 'https://')):
+            # Scheme yoksa http:// ekle
+            proxy = f"http://{proxy}"
+        
+        # URL'yi parse et ve validate et
+        try:
+            parsed = urlparse(proxy)
+            
+            # Hostname ve port kontrolü
+            if not parsed.hostname:
+                logger.warning("Hatalı proxy hostname: %s", proxy_line[:50])
+                return None
+            
+            if not parsed.port:
+                logger.warning("Hatalı proxy port: %s", proxy_line[:50])
+                return None
+            
+            # Port sayı kontrolü
+            if not (1 <= parsed.port <= 65535):
+                logger.warning("Geçersiz port numarası: %s", proxy_line[:50])
+                return None
+            
+            # IP adresi kontrolü (IPv4/IPv6, C tarafında yapılır)
+            host = parsed.hostname
+            try:
+                if ipaddress.ip_address(host).version == 6:
+                    host = f"[{host}]"
+            except ValueError:
+                # Host adı; ama sadece rakam ve noktalardan oluşuyorsa geçersiz IP (ör. 999.1.1.1)
+                if host.replace('.', '').isdigit():
+                    logger.warning("Geçersiz IP adresi: %s", proxy_line[:50])
+                    return None
+            
+            # Normalize edilmiş URL'yi yeniden oluştur
+            if parsed.username and parsed.password:
+                normalized_proxy = f"{parsed.scheme}://{parsed.username}:{parsed.password}@{host}:{parsed.port}"
+            else:
+                normalized_proxy = f"{parsed.scheme}://{host}:{parsed.port}"
+            
+            return normalized_proxy
+            
+        except ValueError as e:
+            logger.warning("URL parse hatası: %s - %s", proxy_line[:50], str(e))
+            return None
+        
+    except Exception as e:
+        logger.warning("Proxy normalize hatası: %s - %s", proxy_line[:50], str(e))
+        return None
+
+# get_anti_bot_headers'ın her çağrıda rastgele seçtiği header'lar (cache'lenmez)
+_RANDOMIZED_HEADERS = ('User-Agent', 'Accept', 'Cache-Control', 'DNT')
+
+@lru_cache(maxsize=64)
+def _stable_request_headers(url: str, referer: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    URL için anti-bot istek header'larının sabit kısmı, (key, value) tuple'ları olarak.
+    
+    URL başına bir kez oluşturulur; rastgele header'lar her istekte yeniden seçilir.
+    """
+    headers = get_anti_bot_headers(url, 'en-ca', referer=referer)
+    for key in _RANDOMIZED_HEADERS:
+        headers.pop(key, None)
+    return tuple(headers.items())
+
+
 class CanadaVisaChecker:
     """Kanada vize randevu kontrol işlemlerini yönetir."""
 
     def __init__(self):
-        self.session = requests.Session()
         self.base_url = "https://canada.ca"
         
-        # Gelişmiş anti-bot header sistemi
+        # Gelişmiş anti-bot header sistemi (Connection: keep-alive dahil)
         self.headers = get_anti_bot_headers(self.base_url, 'en-ca')
-        self.session.headers.update(self.headers)
+        self.session = self._create_session()
+        # Aynı proxy tekrar kullanıldığında bağlantı havuzu sıcak kalsın diye proxy başına session
+        self._proxy_sessions = {}  # proxy_url: requests.Session
         
-        # Proxy dosyasından proxy listesini yükle
-        self.proxies = self._load_proxies()
-        # Hatalı proxy'leri blacklist'te tut
+        # Hatalı proxy'leri blacklist'te tut (_load_proxies hatalı satırları buraya ekler)
         self.blacklisted_proxies = set()
+        # Proxy dosyasından proxy listesini yükle (üyelik kontrolleri için set)
+        self.proxies = set(self._load_proxies())
+        # Seçilebilir proxy'ler: liste + index (blacklist'e alma O(1) swap-pop)
+        self._available_proxies = [p for p in self.proxies if p not in self.blacklisted_proxies]
+        self._available_index = {p: i for i, p in enumerate(self._available_proxies)}
         # Başarısız proxy denemelerini takip et
         self.failed_proxy_attempts = {}  # proxy_url: fail_count
         self.max_proxy_failures = 1  # Maksimum başarısızlık sayısı (daha katı)
         # Bağlantı timeout'u (saniye)
         self.proxy_timeout = 3  # 7'den 3'e düşürüldü (agresif)
+        # Rate limit: aynı (host, proxy) çiftine ardışık istekler arasında 4-8 sn;
+        # farklı host'lar/proxy'ler birbirini bekletmez
+        self.request_interval = (4, 8)  # saniye (min, max)
+        self._next_request_at = {}  # (host, proxy_url): monotonic zaman
+        self._max_rate_entries = 4096
+        # Koşullu GET için URL başına ETag/Last-Modified ve son parse sonucu
+        # (304 gelirse sayfa tekrar indirilip parse edilmez)
+        self._validators = {}  # url: {'If-None-Match': ..., 'If-Modified-Since': ...}
+        self._last_parse = {}  # url: appointments
         
         # Kanada vize merkezi URL'leri (Türkiye için)
         self.locations = {
@@ -62,71 +218,47 @@ class CanadaVisaChecker:
             }
         }
     
+    def _create_session(self) -> requests.Session:
+        """Bağlantı havuzu ve geçici hatalar için retry ayarlanmış session oluştur"""
+        session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                        allowed_methods=["GET", "HEAD"])
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.headers)
+        return session
+    
+    def _get_session(self, proxy: Optional[Dict]) -> requests.Session:
+        """Proxy'ye ait session'ı döndür (proxy yoksa ana session)"""
+        if not proxy:
+            return self.session
+        
+        proxy_url = proxy['http']
+        session = self._proxy_sessions.get(proxy_url)
+        if session is None:
+            session = self._proxy_sessions[proxy_url] = self._create_session()
+        return session
+    
     def _normalize_proxy_url(self, proxy_line: str) -> Optional[str]:
+        """Proxy URL'sini normalize eder (bkz. modül seviyesindeki _normalize_proxy_url)"""
+        return _normalize_proxy_url(proxy_line)
+    
+    def _normalize_proxy_lines(self, lines: List[str]) -> List[Optional[str]]:
         """
-        Proxy URL'sini normalize eder ve validasyon yapar.
+        Proxy satırlarını normalize eder; büyük listeler process pool'da işlenir.
         
-        Args:
-            proxy_line (str): Ham proxy satırı
-            
         Returns:
-            str: Normalize edilmiş proxy URL'si veya None (hatalı ise)
+            list: Her satır için normalize edilmiş URL veya None (aynı sırada)
         """
-        try:
-            proxy = proxy_line.strip()
-            
-            # Boş satır kontrolü
-            if not proxy:
-                return None
-            
-            # URL scheme'i kontrol et
-            if not proxy.startswith(('http://', 'https://')):
-                # Scheme yoksa http:// ekle
-                proxy = f"http://{proxy}"
-            
-            # URL'yi parse et ve validate et
+        if len(lines) >= _PARALLEL_NORMALIZE_MIN_LINES and (os.cpu_count() or 1) > 1:
             try:
-                parsed = urlparse(proxy)
-                
-                # Hostname ve port kontrolü
-                if not parsed.hostname:
-                    logger.warning("Hatalı proxy hostname: %s", proxy_line[:50])
-                    return None
-                
-                if not parsed.port:
-                    logger.warning("Hatalı proxy port: %s", proxy_line[:50])
-                    return None
-                
-                # Port sayı kontrolü
-                if not (1 <= parsed.port <= 65535):
-                    logger.warning("Geçersiz port numarası: %s", proxy_line[:50])
-                    return None
-                
-                # IP adresi regex kontrolü (opsiyonel)
-                ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-                if re.match(ip_pattern, parsed.hostname):
-                    # IP adresi formatında ise her oktet 0-255 arası olmalı
-                    octets = parsed.hostname.split('.')
-                    for octet in octets:
-                        if not (0 <= int(octet) <= 255):
-                            logger.warning("Geçersiz IP adresi: %s", proxy_line[:50])
-                            return None
-                
-                # Normalize edilmiş URL'yi yeniden oluştur
-                if parsed.username and parsed.password:
-                    normalized_proxy = f"{parsed.scheme}://{parsed.username}:{parsed.password}@{parsed.hostname}:{parsed.port}"
-                else:
-                    normalized_proxy = f"{parsed.scheme}://{parsed.hostname}:{parsed.port}"
-                
-                return normalized_proxy
-                
-            except ValueError as e:
-                logger.warning("URL parse hatası: %s - %s", proxy_line[:50], str(e))
-                return None
-            
-        except Exception as e:
-            logger.warning("Proxy normalize hatası: %s - %s", proxy_line[:50], str(e))
-            return None
+                with ProcessPoolExecutor() as executor:
+                    return list(executor.map(_normalize_proxy_url, lines, chunksize=_NORMALIZE_CHUNK_SIZE))
+            except Exception as e:
+                logger.warning("Paralel proxy normalize hatası, sırayla devam ediliyor: %s", str(e))
+        
+        return [_normalize_proxy_url(line) for line in lines]
     
     def _load_proxies(self) -> List[str]:
         """
@@ -134,31 +266,32 @@ class CanadaVisaChecker:
         """
         try:
             with open(PROXY_LIST_FILE, 'r', encoding='utf-8') as f:
-                proxies = []
-                total_lines = 0
-                skipped_lines = 0
-                
-                for line_num, line in enumerate(f, 1):
-                    total_lines += 1
-                    line = line.strip()
-                    
-                    # Boş satırları ve comment satırlarını atla
-                    if not line or line.startswith('#'):
-                        skipped_lines += 1
-                        continue
-                    
-                    # Proxy'yi normalize et
-                    normalized_proxy = self._normalize_proxy_url(line)
-                    
-                    if normalized_proxy:
-                        proxies.append(normalized_proxy)
-                        logger.debug("Satır %d: Proxy eklendi: %s", line_num, 
-                                   normalized_proxy.split('@')[0] + '@***' if '@' in normalized_proxy else normalized_proxy)
-                    else:
-                        skipped_lines += 1
-                        logger.warning("Satır %d: Hatalı proxy atlandı: %s", line_num, line[:50])
-                        # Hatalı proxy'yi blacklist'e ekle
-                        self.blacklisted_proxies.add(line.strip())
+                lines = f.read().splitlines()
+            
+            proxies = []
+            total_lines = len(lines)
+            
+            # Boş satırları ve comment satırlarını atla
+            candidates = []  # (satır no, satır)
+            for line_num, line in enumerate(lines, 1):
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    candidates.append((line_num, line))
+            skipped_lines = total_lines - len(candidates)
+            
+            # Proxy'leri normalize et (büyük dosyalarda CPU çekirdeklerine dağıtılır)
+            normalized = self._normalize_proxy_lines([line for _, line in candidates])
+            
+            for (line_num, line), normalized_proxy in zip(candidates, normalized):
+                if normalized_proxy:
+                    proxies.append(normalized_proxy)
+                    logger.debug("Satır %d: Proxy eklendi: %s", line_num, 
+                               normalized_proxy.split('@')[0] + '@***' if '@' in normalized_proxy else normalized_proxy)
+                else:
+                    skipped_lines += 1
+                    logger.warning("Satır %d: Hatalı proxy atlandı: %s", line_num, line[:50])
+                    # Hatalı proxy'yi blacklist'e ekle
+                    self.blacklisted_proxies.add(line)
                         
             logger.info("%d/%d proxy başarıyla yüklendi (%d hatalı proxy atlandı)", 
                        len(proxies), total_lines, skipped_lines)
@@ -171,6 +304,19 @@ class CanadaVisaChecker:
             logger.error("Proxy dosyası okuma hatası: %s", str(e))
             return []
     
+    def _blacklist_proxy(self, proxy_url: str):
+        """Proxy'yi blacklist'e al ve seçilebilir proxy'lerden çıkar"""
+        self.blacklisted_proxies.add(proxy_url)
+
+        index = self._available_index.pop(proxy_url, None)
+        if index is None:
+            return
+        # Son elemanı boşalan yere taşı
+        last = self._available_proxies.pop()
+        if index < len(self._available_proxies):
+            self._available_proxies[index] = last
+            self._available_index[last] = index
+    
     def _get_random_proxy(self) -> Optional[Dict]:
         """
         Requests için proxy dict formatında döndür
@@ -179,20 +325,18 @@ class CanadaVisaChecker:
             return None
 
         # Blacklist'te olmayan proxy'ler arasından seç
-        available_proxies = [p for p in self.proxies if p not in self.blacklisted_proxies]
-        
-        if not available_proxies:
+        if not self._available_proxies:
             logger.warning("Tüm proxy'ler blacklist'te, proxy olmadan devam ediliyor")
             return None
 
-        proxy_url = random.choice(available_proxies)
+        proxy_url = random.choice(self._available_proxies)
 
         try:
             # Proxy URL'sinin geçerli olduğunu son kez kontrol et
             parsed = urlparse(proxy_url)
             if not (parsed.hostname and parsed.port):
                 logger.warning("_get_random_proxy: Geçersiz proxy URL")
-                self.blacklisted_proxies.add(proxy_url)
+                self._blacklist_proxy(proxy_url)
                 return None
             
             logger.info("Seçilen proxy: %s", proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url)
@@ -204,19 +348,48 @@ class CanadaVisaChecker:
             
         except Exception as e:
             logger.warning("Proxy dict oluşturma hatası: %s", str(e))
-            self.blacklisted_proxies.add(proxy_url)
+            self._blacklist_proxy(proxy_url)
             return None
     
+    def _request_headers(self, url: str) -> Dict[str, str]:
+        """URL için istek header'larını oluştur (sabit kısım cache'ten, rastgele alanlar her istekte)"""
+        headers = dict(_stable_request_headers(url, self.base_url))
+        headers['User-Agent'] = random.choice(USER_AGENTS)
+        headers['Accept'] = random.choice(ACCEPT_HEADERS)
+        headers['Cache-Control'] = random.choice(CACHE_CONTROL_OPTIONS)
+        if random.getrandbits(1):
+            headers['DNT'] = '1'
+        return headers
+    
+    def _reserve_request_slot(self, url: str, proxy_url: Optional[str]) -> float:
+        """
+        (host, proxy) çifti için sıradaki istek zamanını ayır.
+        
+        Returns:
+            float: İstekten önce beklenmesi gereken süre (saniye)
+        """
+        now = time.monotonic()
+        if len(self._next_request_at) >= self._max_rate_entries:
+            # Süresi geçmiş kayıtlar beklemeye sebep olmaz, silinebilir
+            self._next_request_at = {k: t for k, t in self._next_request_at.items() if t > now}
+        
+        key = (urlparse(url).hostname, proxy_url)
+        start = max(now, self._next_request_at.get(key, now))
+        self._next_request_at[key] = start + random.uniform(*self.request_interval)
+        return start - now
+    
     def _make_request(self, url: str, method: str = 'GET', **kwargs) -> Optional[requests.Response]:
         """Proxy ile güvenli istek gönder - Gelişmiş anti-bot header'larla"""
         proxy = self._get_random_proxy()
         
         try:
-            # Her istek için yeni anti-bot header'lar al
-            dynamic_headers = get_anti_bot_headers(url, 'en-ca', referer=self.base_url)
+            # Rate limiting: sadece aynı host+proxy'ye yakın zamanda istek atıldıysa bekle
+            delay = self._reserve_request_slot(url, proxy['http'] if proxy else None)
+            if delay:
+                time.sleep(delay)
             
-            # Mevcut header'ları güncelle
-            combined_headers = {**self.headers, **dynamic_headers}
+            # Her istek için cache'lenmiş URL header'ları + dönen User-Agent
+            combined_headers = self._request_headers(url)
             if 'headers' in kwargs:
                 combined_headers.update(kwargs['headers'])
             kwargs['headers'] = combined_headers
@@ -225,10 +398,11 @@ class CanadaVisaChecker:
             if 'timeout' not in kwargs:
                 kwargs['timeout'] = self.proxy_timeout
             
+            session = self._get_session(proxy)
             if method.upper() == 'GET':
-                response = self.session.get(url, proxies=proxy, **kwargs)
+                response = session.get(url, proxies=proxy, **kwargs)
             else:
-                response = self.session.post(url, proxies=proxy, **kwargs)
+                response = session.post(url, proxies=proxy, **kwargs)
 
             # Başarılı istek - proxy'yi başarılı listesinden çıkar
             if proxy and 'http' in proxy:
@@ -238,8 +412,6 @@ class CanadaVisaChecker:
                     logger.debug("Proxy başarılı oldu, fail counter sıfırlandı: %s", 
                                proxy_url.split('@')[0] + '@***' if '@' in proxy_url else proxy_url)
             
-            # Rate limiting için bekle
-            time.sleep(random.uniform(4, 8))
             return response
             
         except requests.exceptions.ProxyError as e:
@@ -306,15 +478,20 @@ class CanadaVisaChecker:
             
             # Maksimum başarısızlık sayısına ulaştıysa kalıcı blacklist'e ekle
             if fail_count >= self.max_proxy_failures:
-                self.blacklisted_proxies.add(proxy_url)
+                self._blacklist_proxy(proxy_url)
                 logger.warning("BLACKLIST: Proxy artık kullanılmayacak: %s (Toplam %d başarısızlık - %s)", 
                              display_proxy, fail_count, error_type)
                 
                 # Proxy listesinden de çıkar
                 if proxy_url in self.proxies:
-                    self.proxies.remove(proxy_url)
+                    self.proxies.discard(proxy_url)
                     logger.info("REMOVED: Proxy ana listeden çıkarıldı: %s", display_proxy)
                 
+                # Proxy'nin session'ını ve açık bağlantılarını kapat
+                session = self._proxy_sessions.pop(proxy_url, None)
+                if session is not None:
+                    session.close()
+                
                 # Başarısızlık sayacını temizle
                 if proxy_url in self.failed_proxy_attempts:
                     del self.failed_proxy_attempts[proxy_url]
@@ -333,7 +510,7 @@ class CanadaVisaChecker:
             'total_proxies': len(self.proxies),
             'blacklisted_proxies': len(self.blacklisted_proxies),
             'failed_attempts': len(self.failed_proxy_attempts),
-            'available_proxies': len([p for p in self.proxies if p not in self.blacklisted_proxies])
+            'available_proxies': len(self._available_proxies)
         }
     
     def check_appointments(self) -> Optional[str]:
@@ -341,13 +518,16 @@ class CanadaVisaChecker:
         try:
             available_appointments = []
 
-            for city, location_info in self.locations.items():
-                logger.info("%s kontrol ediliyor...", location_info['name'])
+            # HTTP kontrolleri: aiohttp varsa lokasyonlar eşzamanlı, yoksa sırayla
+            cities = list(self.locations)
+            if aiohttp is not None:
+                http_results = asyncio.run(self._check_all_async(cities))
+            else:
+                http_results = {city: self._check_with_requests(city, self.locations[city]) for city in cities}
 
-                # Önce HTTP request kontrolü dene
-                http_appointments = self._check_with_requests(city, location_info)
-                if http_appointments:
-                    available_appointments.extend(http_appointments)
+            for city, location_info in self.locations.items():
+                if http_results[city]:
+                    available_appointments.extend(http_results[city])
                 else:
                     # HTTP başarısız olursa browser kontrolü yap
                     browser_appointments = self._check_with_browser(city, location_info)
@@ -363,63 +543,163 @@ class CanadaVisaChecker:
             logger.error("Kanada vize kontrolünde hata: %s", str(e))
             raise
 
+    async def _check_all_async(self, cities: List[str]) -> Dict[str, List[str]]:
+        """Lokasyonları tek aiohttp session'ında eşzamanlı kontrol et"""
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = await asyncio.gather(*(
+                self._check_with_aiohttp(session, city, self.locations[city])
+                for city in cities
+            ))
+        return dict(zip(cities, results))
+
+    async def _check_with_aiohttp(self, session, city: str, location_info: Dict) -> List[str]:
+        """_check_with_requests'in aiohttp versiyonu (proxy hata yönetimi aynı)"""
+        logger.info("%s kontrol ediliyor...", location_info['name'])
+        proxy = self._get_random_proxy()
+        proxy_url = proxy['http'] if proxy else None
+        url = location_info['url']
+
+        try:
+            # Rate limiting: sadece aynı host+proxy'ye yakın zamanda istek atıldıysa bekle
+            delay = self._reserve_request_slot(url, proxy_url)
+            if delay:
+                await asyncio.sleep(delay)
+
+            headers = self._request_headers(url)
+            headers.update(self._validators.get(url, {}))
+            timeout = aiohttp.ClientTimeout(total=self.proxy_timeout)
+
+            async with session.get(url, proxy=proxy_url, headers=headers, timeout=timeout) as response:
+                status = response.status
+                response_headers = response.headers
+                content = await response.read() if status == 200 else b''
+
+            # Başarılı istek - proxy'nin fail counter'ını sıfırla
+            if proxy_url and proxy_url in self.failed_proxy_attempts:
+                del self.failed_proxy_attempts[proxy_url]
+
+        except aiohttp.ClientProxyConnectionError as e:
+            logger.error("Proxy hatası: %s", str(e))
+            error_type = "ProxyError"
+        except aiohttp.ClientSSLError as e:
+            logger.error("SSL protokol hatası: %s", str(e))
+            error_type = "SSLError"
+        except aiohttp.ClientConnectorError as e:
+            logger.error("Bağlantı hatası: %s", str(e))
+            error_type = "ConnectionError"
+        except asyncio.TimeoutError:
+            logger.error("Proxy timeout hatası (%ds)", self.proxy_timeout)
+            error_type = "Timeout"
+        except aiohttp.ClientError as e:
+            logger.error("HTTP istek hatası: %s", str(e))
+            error_type = "RequestException"
+        except Exception as e:
+            logger.error("HTTP requests hatası (%s): %s", city, str(e))
+            error_type = "Unknown"
+        else:
+            if status == 304:
+                return self._not_modified_result(city, url)
+            if status != 200:
+                logger.warning("HTTP isteği başarısız: %s", city)
+                return []
+            return self._parse_appointments(city, location_info, content, response_headers)
+
+        if proxy_url:
+            self._handle_proxy_failure(proxy_url, error_type)
+        logger.warning("HTTP isteği başarısız: %s", city)
+        return []
+
     def _check_with_requests(self, city: str, location_info: Dict) -> List[str]:
         """HTTP requests ile kontrol (mevcut sistem)"""
+        logger.info("%s kontrol ediliyor...", location_info['name'])
         try:
-            response = self._make_request(location_info['url'])
+            url = location_info['url']
+            response = self._make_request(url, headers=self._validators.get(url, {}))
+            if response is not None and response.status_code == 304:
+                return self._not_modified_result(city, url)
             if not response or response.status_code != 200:
                 logger.warning("HTTP isteği başarısız: %s", city)
                 return []
 
-            # HTML içeriğini parse et
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self._parse_appointments(city, location_info, response.content, response.headers)
 
-            # Sayfa metnini kontrol et
-            page_text = soup.get_text().lower()
-            
-            # Randevu sistemi ifadeleri
-            appointment_system_phrases = [
-                'book an appointment',
-                'schedule appointment',
-                'make an appointment',
-                'appointment booking',
-                'visa application centre',
-                'biometric appointment',
-                'randevu al',
-                'randevu oluştur'
-            ]
-
-            # Randevu link'leri
-            appointment_links = soup.find_all('a', href=re.compile(r'appointment|booking|schedule', re.I))
-
-            # IRCC portal referansları
-            ircc_references = soup.find_all(text=re.compile(r'ircc|immigration.*canada', re.I))
+        except Exception as e:
+            logger.error("HTTP requests hatası (%s): %s", city, str(e))
+            return []
+
+    def _not_modified_result(self, city: str, url: str) -> List[str]:
+        """304 Not Modified: son parse sonucunu döndür"""
+        appointments = self._last_parse.get(url)
+        if appointments is None:
+            # Parse sonucu yoksa validator'ı bırak, sonraki istekte sayfa tam indirilir
+            self._validators.pop(url, None)
+            logger.warning("HTTP 304 ama önceki sonuç yok: %s", city)
+            return []
+
+        logger.debug("Sayfa değişmemiş (304), önceki sonuç kullanılıyor: %s", city)
+        return appointments
+
+    def _parse_appointments(self, city: str, location_info: Dict, content: bytes,
+                            response_headers=None) -> List[str]:
+        """HTTP yanıtındaki sayfa içeriğinden randevu sistemi bilgisini çıkar"""
+        try:
+            # HTML içeriğini parse et (selectolax varsa C parser, yoksa BeautifulSoup)
+            if HTMLParser is not None:
+                tree = HTMLParser(content)
+                soup = None
+            else:
+                tree = None
+                soup = BeautifulSoup(content, 'html.parser')
 
             appointments = []
             
-            # Randevu sistemi metni kontrolü
-            has_appointment_system = any(phrase in page_text for phrase in appointment_system_phrases)
-            
-            # Link kontrolü
-            has_appointment_links = len(appointment_links) > 0
+            # Randevu link'leri (ucuz kontrol önce: link varsa tüm metnin çıkarılıp
+            # küçük harfe çevrilmesine gerek kalmaz)
+            if tree is not None:
+                has_appointment_system = any(
+                    _APPT_RE.search(node.attributes.get('href') or '') for node in tree.css('a[href]')
+                )
+            else:
+                has_appointment_system = soup.find('a', href=_APPT_RE) is not None
             
-            # IRCC referansı
-            has_ircc_reference = len(ircc_references) > 0
+            # Randevu sistemi metni kontrolü
+            if not has_appointment_system:
+                page_text = tree.text() if tree is not None else soup.get_text()
+                has_appointment_system = _has_appointment_phrase(page_text.lower())
 
-            if has_appointment_system or has_appointment_links:
+            if has_appointment_system:
                 appointments.append(f"📍 {location_info['name']} (HTTP): Randevu sistemi mevcut")
-            elif has_ircc_reference:
+            elif self._has_ircc_reference(tree, soup):
                 appointments.append(f"📍 {location_info['name']} (HTTP): IRCC portal yönlendirmesi")
 
             if appointments:
                 logger.info("HTTP ile randevu sistemi bulundu: %s", city)
 
+            # Sadece başarıyla parse edilen sayfalar koşullu GET'e açılır
+            url = location_info['url']
+            self._last_parse[url] = appointments
+            if response_headers is not None:
+                validators = {}
+                if response_headers.get('ETag'):
+                    validators['If-None-Match'] = response_headers['ETag']
+                if response_headers.get('Last-Modified'):
+                    validators['If-Modified-Since'] = response_headers['Last-Modified']
+                self._validators[url] = validators
             return appointments
 
         except Exception as e:
-            logger.error("HTTP requests hatası (%s): %s", city, str(e))
+            logger.error("HTML parse hatası (%s): %s", city, str(e))
             return []
 
+    @staticmethod
+    def _has_ircc_reference(tree, soup) -> bool:
+        """Sayfa metin node'larından biri IRCC portal referansı içeriyor mu"""
+        if tree is not None:
+            # Node'lar satırla ayrılır; böylece '.*' sadece tek node içinde eşleşir (BeautifulSoup gibi)
+            return _IRCC_RE.search(tree.text(separator='\n')) is not None
+        return soup.find(text=_IRCC_RE) is not None
+
     def _check_with_browser(self, city: str, location_info: Dict) -> List[str]:
         """Playwright ile JavaScript kontrolü"""
         try:
@@ -677,8 +957,7 @@ class CanadaVisaChecker:
         if not self.proxies:
             return None
 
-        available_proxies = [p for p in self.proxies if p not in self.blacklisted_proxies]
-        if not available_proxies:
+        if not self._available_proxies:
             return None
 
-        return random.choice(available_proxies) 
\ No newline at end of file
+        return random.choice(self._available_proxies) 
\ No newline at end of file